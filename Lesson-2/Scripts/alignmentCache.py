@@ -0,0 +1,89 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+# Bumped whenever the layout or the allele encoding of cached entries changes
+cacheVersion = '2'
+def contentKey(path,codonTable,blockSize=1 << 20):
+
+	# Same alignment bytes and codon table give the same entry, whatever the file name or mtime
+	digest = hashlib.sha1()
+	handle = open(path,'rb')
+	for block in iter(lambda: handle.read(blockSize),b''):
+		digest.update(block)
+	handle.close()
+	digest.update(('\t' + codonTable + '\t' + cacheVersion).encode('ascii'))
+
+	return(digest.hexdigest())
+def entrySize(entry):
+	return(sum([os.path.getsize(os.path.join(entry,f)) for f in os.listdir(entry)]))
+class AlignmentCache(object):
+
+	# One directory per key with samples.txt, codes.npy (samples x columns, outgroup last) and degen.npy (reference degeneracy per column)
+	def __init__(self,directory,maxBytes):
+		self.directory = directory
+		self.maxBytes = maxBytes
+		if(not os.path.isdir(directory)):
+			os.makedirs(directory)
+
+	def load(self,key):
+		# Memory-mapped arrays, nothing is read until columns are used. Any unreadable entry counts as a miss
+		entry = os.path.join(self.directory,key)
+		try:
+			samples = open(os.path.join(entry,'samples.txt')).read().split('\n')[:-1]
+			codes = np.load(os.path.join(entry,'codes.npy'),mmap_mode='r')
+			degen = np.load(os.path.join(entry,'degen.npy'),mmap_mode='r')
+			# The entry mtime is the last use, eviction removes the least recently used entries first
+			os.utime(entry,None)
+		except (IOError,OSError,ValueError):
+			return(None)
+
+		return(samples,codes,degen)
+
+	def create(self,shape):
+		# Entries are filled in a private directory and renamed in place once complete, so readers never see half an entry
+		staging = tempfile.mkdtemp(prefix='.staging',dir=self.directory)
+		codes = np.lib.format.open_memmap(os.path.join(staging,'codes.npy'),mode='w+',dtype=np.uint8,shape=shape)
+		degen = np.lib.format.open_memmap(os.path.join(staging,'degen.npy'),mode='w+',dtype=np.uint8,shape=(shape[1],))
+
+		return(staging,codes,degen)
+
+	def commit(self,key,staging,samples,codes,degen):
+		codes.flush()
+		degen.flush()
+		del codes,degen
+		f = open(os.path.join(staging,'samples.txt'),'w')
+		f.write(''.join([sample + '\n' for sample in samples]))
+		f.close()
+
+		# Another process may have stored the same key meanwhile, its entry is kept
+		try:
+			os.rename(staging,os.path.join(self.directory,key))
+		except OSError:
+			shutil.rmtree(staging,ignore_errors=True)
+		self.evict(keep=key)
+
+	def discard(self,staging):
+		shutil.rmtree(staging,ignore_errors=True)
+
+	def evict(self,keep=None):
+		# Least recently used entries go first until the cache fits its cap. The newest entry stays even if it is larger than the cap
+		entries = list()
+		for key in os.listdir(self.directory):
+			entry = os.path.join(self.directory,key)
+			if(key.startswith('.') or not os.path.isdir(entry)):
+				continue
+			try:
+				entries.append((os.path.getmtime(entry),entrySize(entry),key))
+			except OSError:
+				continue
+
+		total = sum([size for mtime,size,key in entries])
+		for mtime,size,key in sorted(entries):
+			if(total <= self.maxBytes):
+				break
+			if(key != keep):
+				shutil.rmtree(os.path.join(self.directory,key),ignore_errors=True)
+				total -= size
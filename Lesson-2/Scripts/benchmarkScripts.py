@@ -0,0 +1,234 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+import pyfaidx as px
+import sfsFromFasta_v2 as sfs
+import subsetMultiFasta as subset
+from stageProfile import peakMemory
+from fastaReader import readers,openFasta
+
+# Sense codons used to build synthetic references, stop codons excluded
+senseCodons = [a + b + c for a in 'ACGT' for b in 'ACGT' for c in 'ACGT' if(a + b + c not in ['TAA','TAG','TGA'])]
+ambiguityCodes = np.frombuffer(b'RYSWKM',dtype=np.uint8)
+stages = ['matrix','degeneracy','sfs','format','stream','subset']
+
+def writeFasta(path,names,sequences,width=60):
+	f = open(path,'w')
+	for name,seq in zip(names,sequences):
+		f.write('>' + name + '\n')
+		for i in range(0,len(seq),width):
+			f.write(seq[i:i+width] + '\n')
+	f.close()
+def syntheticSequences(nSamples,length,seed,missing=0.01,segregating=0.05,divergence=0.02,ambiguous=0.001):
+
+	# Reference first, nSamples ingroup sequences, outgroup last
+	rng = np.random.RandomState(seed)
+	bases = np.array(list(b'ACGT'),dtype=np.uint8)
+	reference = np.frombuffer(''.join(rng.choice(senseCodons,length // 3)).encode('ascii'),dtype=np.uint8)
+
+	sites = np.flatnonzero(rng.rand(reference.shape[0]) < segregating)
+	alternative = bases[rng.randint(0,4,sites.shape[0])]
+	sequences = [reference]
+	for i in range(nSamples):
+		seq = reference.copy()
+		carriers = rng.rand(sites.shape[0]) < 0.3
+		seq[sites[carriers]] = alternative[carriers]
+		gaps = rng.rand(seq.shape[0])
+		seq[gaps < missing / 2] = ord('N')
+		seq[(gaps >= missing / 2) & (gaps < missing)] = ord('-')
+		iupac = (gaps >= missing) & (gaps < missing + ambiguous)
+		seq[iupac] = ambiguityCodes[rng.randint(0,ambiguityCodes.shape[0],iupac.sum())]
+		sequences.append(seq)
+
+	outgroup = reference.copy()
+	fixed = rng.rand(outgroup.shape[0]) < divergence
+	outgroup[fixed] = bases[rng.randint(0,4,fixed.sum())]
+	sequences.append(outgroup)
+
+	return([seq.tobytes().decode('ascii') for seq in sequences])
+def writeAlignment(path,nSamples,length,seed,missing=0.01,segregating=0.05,ambiguous=0.001):
+	sequences = syntheticSequences(nSamples,length,seed,missing,segregating,ambiguous=ambiguous)
+	writeFasta(path,['reference'] + ['sample' + str(i) for i in range(nSamples)] + ['outgroup'],sequences)
+def writeGenome(prefix,nSamples,length,seed,exonLength=300):
+
+	# Whole-genome reference, population and outgroup FASTA plus a coordinates table of 3-exon transcripts on alternating strands
+	sequences = syntheticSequences(nSamples,length,seed)
+	writeFasta(prefix + 'Reference.fa',['reference'],sequences[:1])
+	writeFasta(prefix + 'Multi.fa',['sample' + str(i) for i in range(nSamples)],sequences[1:-1])
+	writeFasta(prefix + 'Outgroup.fa',['outgroup'],sequences[-1:])
+
+	f = open(prefix + 'Coordinates.txt','w')
+	f.write('start\tend\tstrand\ttranscript\n')
+	for i,start in enumerate(range(1,length - 6 * exonLength,6 * exonLength)):
+		for exon in range(3):
+			begin = start + 2 * exon * exonLength
+			f.write('\t'.join([str(begin),str(begin + exonLength - 1),'+-'[i % 2],'transcript' + str(i)]) + '\n')
+	f.close()
+def referenceAlignment(path):
+
+	# Raw pyfaidx strings, independent of the engine: reference, every ingroup sample that is not all N, outgroup last
+	fasta = px.Fasta(path,sequence_always_upper=True,read_long_names=True)
+	sequences = [(name,fasta[name][:].seq) for name in fasta.keys()]
+	kept = [(name,seq) for name,seq in sequences[1:] if(seq != 'N' * len(seq))]
+
+	return(sequences[0][1],[name for name,seq in kept],[seq for name,seq in kept])
+def referenceDegeneracy(seq,codonTable='standard'):
+
+	# Codon by codon dictionary lookup as degenerancy did. Codons outside the table have no degeneracy ('')
+	table = sfs.codonTables[codonTable]
+	degen = list()
+	for i in range(0,len(seq) - len(seq) % 3,3):
+		digits = table.get(seq[i:i+3])
+		degen.extend(list(digits) if(digits is not None) else ['','',''])
+
+	return(degen + [''] * (len(seq) % 3))
+def engineDegeneracy(degen):
+	return([str(d) if(d != 255) else '' for d in degen.tolist()])
+def referenceSfs(sequences,degen):
+
+	# Straightforward per-column loop over characters with the original semantics, used to check the vectorized engine
+	output = list()
+	AN = float(len(sequences) - 1)
+	for column,d in enumerate(degen):
+		if(d not in ['0','4']):
+			continue
+		alleles = [seq[column] for seq in sequences]
+		pol,AA = alleles[:-1],alleles[-1]
+		functionalClass = '4fold' if(d == '4') else '0fold'
+		if(AA in ['N','-'] or 'N' in pol or '-' in pol or len(set(alleles)) == 1):
+			continue
+		observed = sorted(set(pol))
+		if(len(observed) == 1):
+			output.append([0,1,functionalClass])
+		elif(AA in observed):
+			output.append([pol.count([a for a in observed if(a != AA)][0]) / AN,0,functionalClass])
+
+	return(output)
+def referenceTables(records,degen):
+
+	# DAF and divergence tables from the per-site records with pd.cut, as formatSfs wrote them before the engine did
+	df = pd.DataFrame(records,columns=['daf','d','functionalClass'])
+	polymorphic = df[df['d'] == 0].copy()
+	polymorphic['bin'] = pd.cut(polymorphic['daf'],bins=sfs.dafBins,labels=False)
+	counts = polymorphic.dropna().astype({'bin':int}).groupby(['functionalClass','bin']).size().to_dict()
+	fixed = df[df['d'] == 1]['functionalClass'].value_counts().to_dict()
+
+	daf = pd.DataFrame({'daf':np.round(sfs.dafLabels,6)})
+	daf['Pi'] = [counts.get(('0fold',b),0) for b in range(daf.shape[0])]
+	daf['P0'] = [counts.get(('4fold',b),0) for b in range(daf.shape[0])]
+	div = pd.DataFrame({'mi':[degen.count('0')],'D0':[fixed.get('4fold',0)],'m0':[degen.count('4')],'Di':[fixed.get('0fold',0)]})
+
+	return(daf,div)
+def sameTables(expected,observed):
+
+	# Same columns and values, whatever the number formatting
+	return(all([list(a.columns) == list(b.columns) and a.shape == b.shape and np.allclose(a.values.astype(np.float64),b.values.astype(np.float64)) for a,b in zip(expected,observed)]))
+def engineTables(result):
+	return(pd.DataFrame(list(result.dafRows()),columns=sfs.dafColumns),pd.DataFrame(list(result.divRows()),columns=sfs.divColumns))
+def runStage(stage,path,prefix,check,reader,queue):
+
+	# Runs in a child process so the peak RSS belongs to this stage only. Setup is not timed, but it is in the peak RSS:
+	# setup is the peak before the timed section (e.g. the matrix built for degeneracy, sfs and format). Checks come after both
+	matched = ''
+	if(stage == 'subset'):
+		plan = subset.extractionPlan(pd.read_csv(prefix + 'Coordinates.txt',sep='\t'))
+		subset.openIndexes(prefix + 'Reference.fa',prefix + 'Multi.fa',prefix + 'Outgroup.fa',reader)
+		ref,file,out = subset.indexes
+		setup = peakMemory()
+		start,cpu = time.time(),sum(os.times()[:2])
+		extracted = [subset.splicedSequence(file,sample,plan) for sample in file.keys()]
+		wall,cpu = time.time() - start,sum(os.times()[:2]) - cpu
+		peak = peakMemory()
+		sites = plan[1].shape[0] * len(extracted)
+		if(check):
+			df = pd.read_csv(prefix + 'Coordinates.txt',sep='\t')
+			faidx = px.Fasta(prefix + 'Multi.fa',sequence_always_upper=True)
+			expected = ''
+			for strand in ['+','-']:
+				for transcript,exons in df[df['strand'] == strand].groupby('transcript',sort=False):
+					seq = faidx.get_spliced_seq(file.keys()[0],exons[['start','end']].values.tolist()).seq
+					expected += subset.reverseComplement(seq) if(strand == '-') else seq
+			matched = str(extracted[0].decode('ascii') == expected)
+	else:
+		file = openFasta(path,reader,longNames=True)
+		setup = peakMemory()
+		start,cpu = time.time(),sum(os.times()[:2])
+		if(stage == 'stream'):
+			result = sfs.sfsFromFile(path,'standard',window=30000,reader=reader)
+		else:
+			matrix = sfs.sequencesToMatrix(file,codonTable='standard')
+		if(stage in ['degeneracy','sfs','format']):
+			setup = peakMemory()
+			start,cpu = time.time(),sum(os.times()[:2])
+		if(stage == 'degeneracy'):
+			result = sfs.degeneracyCodes(matrix.codes[:1],'standard')
+		elif(stage in ['sfs','format']):
+			result = sfs.SfsAccumulator()
+			result.add(matrix)
+		if(stage == 'format'):
+			setup = peakMemory()
+			start,cpu = time.time(),sum(os.times()[:2])
+			result.write(path + '.daf',path + '.div')
+		wall,cpu = time.time() - start,sum(os.times()[:2]) - cpu
+		peak = peakMemory()
+		sites = file.length(file.keys()[0])
+		if(check):
+			# Reference side from raw strings, dictionary degeneracy and pandas tables only
+			referenceSeq,names,sequences = referenceAlignment(path)
+			degen = referenceDegeneracy(referenceSeq)
+			if(stage == 'matrix'):
+				decoded = [sfs.alleleBytes[row].astype(np.uint8).tobytes().decode('ascii') for row in matrix.codes]
+				matched = str(matrix.samples == names and decoded == sequences)
+			elif(stage == 'degeneracy'):
+				matched = str(engineDegeneracy(result[0]) == referenceDegeneracy(sequences[0]) and engineDegeneracy(matrix.degen) == degen)
+			elif(stage in ['sfs','stream']):
+				matched = str(sameTables(referenceTables(referenceSfs(sequences,degen),degen),engineTables(result)))
+			elif(stage == 'format'):
+				matched = str(sameTables(referenceTables(referenceSfs(sequences,degen),degen),[pd.read_csv(path + extension,sep='\t') for extension in ['.daf','.div']]))
+
+	queue.put((wall,cpu,sites,peak,setup,matched))
+
+if __name__ == '__main__':
+	'''Parse arguments and show the required inputs if only name is given to command line'''
+	parser = argparse.ArgumentParser(description='Time sfsFromFasta_v2.py and subsetMultiFasta.py stages on seeded synthetic alignments and check their results.')
+	parser.add_argument('--samples', type = str, required = False, default = '10,50', help = 'Comma-separated ingroup sample counts.')
+	parser.add_argument('--lengths', type = str, required = False, default = '30000,300000', help = 'Comma-separated alignment lengths (rounded down to whole codons).')
+	parser.add_argument('--stages', type = str, required = False, default = ','.join(stages), help = 'Comma-separated stages: ' + ', '.join(stages))
+	parser.add_argument('--seed', type = int, required = False, default = 1, help = 'Seed of the synthetic data.')
+	parser.add_argument('--missing', type = float, required = False, default = 0.01, help = 'Fraction of N/gap cells.')
+	parser.add_argument('--ambiguous', type = float, required = False, default = 0.001, help = 'Fraction of IUPAC ambiguity cells in the ingroup.')
+	parser.add_argument('--segregating', type = float, required = False, default = 0.05, help = 'Fraction of segregating columns.')
+	parser.add_argument('--reader', type = str, required = False, default = 'pyfaidx', choices = readers, help = 'FASTA backend of both scripts.')
+	parser.add_argument('--check', action = 'store_true', help = 'Compare every stage against raw pyfaidx strings, dictionary degeneracy, the per-column reference loop and pandas tables, and subsets against pyfaidx spliced reads.')
+	parser.add_argument('--output', type = str, required = False, help = 'Write results to this file instead of stdout.')
+
+	args = parser.parse_args()
+	workdir = tempfile.mkdtemp(prefix='benchmarkScripts')
+	output = open(args.output,'w') if(args.output is not None) else sys.stdout
+	output.write('\t'.join(['stage','samples','length','seconds','cpuSeconds','sitesPerSecond','peakRssMb','setupPeakRssMb','matchesReference']) + '\n')
+
+	try:
+		for nSamples in [int(n) for n in args.samples.split(',')]:
+			for length in [int(n) for n in args.lengths.split(',')]:
+				length = length - (length % 3)
+				path = os.path.join(workdir,'alignment_%d_%d.fa' % (nSamples,length))
+				prefix = os.path.join(workdir,'genome_%d_%d' % (nSamples,length))
+				writeAlignment(path,nSamples,length,args.seed,args.missing,args.segregating,args.ambiguous)
+				writeGenome(prefix,nSamples,length,args.seed)
+
+				for stage in args.stages.split(','):
+					queue = multiprocessing.Queue()
+					child = multiprocessing.Process(target=runStage,args=(stage,path,prefix,args.check,args.reader,queue))
+					child.start()
+					wall,cpu,sites,peak,setup,matched = queue.get()
+					child.join()
+					output.write('\t'.join([stage,str(nSamples),str(length),'%.4f' % wall,'%.4f' % cpu,'%.0f' % (sites / max(wall,1e-9)),'%.1f' % peak,'%.1f' % setup,matched]) + '\n')
+					output.flush()
+	finally:
+		shutil.rmtree(workdir)
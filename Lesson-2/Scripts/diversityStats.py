@@ -0,0 +1,84 @@
+import numpy as np
+
+# Results table columns, one row per functional class. pi and thetaW are per site
+statsColumns = ['class','n','sites','S','pi','thetaW','tajimaD']
+siteClasses = ['0fold','4fold']
+def tajimaD(nSamples,S,pi):
+
+	# Tajima (1989) from the number of segregating sites and the summed pairwise diversity, nan without segregating sites
+	i = np.arange(1,nSamples,dtype=np.float64)
+	a1,a2 = (1 / i).sum(),(1 / i ** 2).sum()
+	b1 = (nSamples + 1) / (3.0 * (nSamples - 1))
+	b2 = 2.0 * (nSamples ** 2 + nSamples + 3) / (9.0 * nSamples * (nSamples - 1))
+	c1,c2 = b1 - 1 / a1,b2 - (nSamples + 2) / (a1 * nSamples) + a2 / a1 ** 2
+	e1,e2 = c1 / a1,c2 / (a1 ** 2 + a2)
+	S = np.asarray(S,dtype=np.float64)
+	with np.errstate(divide='ignore',invalid='ignore'):
+		return(np.where(S > 0,(pi - S / a1) / np.sqrt(e1 * S + e2 * S * (S - 1)),np.nan))
+class DiversityAccumulator(object):
+
+	# Sites with every ingroup sample called, segregating sites and summed pairwise diversity per group and class (0-fold, 4-fold).
+	# Groups are genes, or bins of columns that sliding windows are summed from
+	def __init__(self,nGroups=0):
+		self.nSamples = None
+		self.sites = np.zeros([nGroups,2],dtype=np.int64)
+		self.S = np.zeros([nGroups,2],dtype=np.int64)
+		self.pi = np.zeros([nGroups,2],dtype=np.float64)
+
+	def resize(self,nGroups):
+		# Bins are added as columns come in
+		if(nGroups > self.sites.shape[0]):
+			extra = nGroups - self.sites.shape[0]
+			self.sites = np.vstack([self.sites,np.zeros([extra,2],dtype=np.int64)])
+			self.S = np.vstack([self.S,np.zeros([extra,2],dtype=np.int64)])
+			self.pi = np.vstack([self.pi,np.zeros([extra,2],dtype=np.float64)])
+
+	def addSites(self,nSamples,fourFold,complete,segregating,pairwise,group):
+		# One entry per 0/4-fold site. Sites with a negative group are ignored
+		if(self.nSamples is not None and self.nSamples != nSamples):
+			raise ValueError('Statistics of %d and %d samples cannot be combined' % (self.nSamples,nSamples))
+		self.nSamples = nSamples
+		used = complete & (group >= 0)
+		self.resize(group.max() + 1 if(group.shape[0] > 0) else 0)
+		cell = group[used] * 2 + fourFold[used]
+		size = self.sites.size
+		self.sites += np.bincount(cell,minlength=size).reshape(-1,2)
+		self.S += np.bincount(cell[segregating[used]],minlength=size).reshape(-1,2)
+		self.pi += np.bincount(cell,weights=pairwise[used],minlength=size).reshape(-1,2)
+
+	def merge(self,other):
+		self.resize(other.sites.shape[0])
+		other.resize(self.sites.shape[0])
+		self.nSamples = self.nSamples or other.nSamples
+		for name in ['sites','S','pi']:
+			setattr(self,name,getattr(self,name) + getattr(other,name))
+		return(self)
+
+	def windows(self,size,step,length):
+		# Windows of size columns every step columns, summed from bins of step columns. Ends are the columns actually summed,
+		# size rounded down to a multiple of step and cut at the alignment end
+		nBins = -(-length // step)
+		self.resize(nBins)
+		width = max(1,size // step)
+		windows = DiversityAccumulator(nBins)
+		windows.nSamples = self.nSamples
+		for name in ['sites','S','pi']:
+			cumulative = np.vstack([np.zeros([1,2]),np.cumsum(getattr(self,name)[:nBins],axis=0)])
+			last = np.minimum(np.arange(nBins) + width,nBins)
+			setattr(windows,name,(cumulative[last] - cumulative[:nBins]).astype(getattr(self,name).dtype))
+		starts = np.arange(nBins) * step
+
+		return(windows,starts,np.minimum(starts + width * step,length))
+
+	def rows(self,keys=None):
+		# Per-site pi and Watterson's theta, Tajima's D from the totals
+		nSamples = self.nSamples or 0
+		a1 = (1 / np.arange(1,nSamples,dtype=np.float64)).sum() if(nSamples > 1) else np.nan
+		D = tajimaD(nSamples,self.S,self.pi) if(nSamples > 3) else np.full(self.S.shape,np.nan)
+		with np.errstate(divide='ignore',invalid='ignore'):
+			pi = self.pi / self.sites
+			theta = self.S / a1 / self.sites
+		for i in range(self.sites.shape[0]):
+			key = [] if(keys is None) else keys[i]
+			for c,name in enumerate(siteClasses):
+				yield(key + [name,nSamples,self.sites[i,c],self.S[i,c],pi[i,c],theta[i,c],D[i,c]])
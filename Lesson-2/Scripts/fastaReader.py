@@ -0,0 +1,137 @@
+import os
+import mmap
+import tempfile
+import numpy as np
+import pyfaidx as px
+
+# Upper case of every byte, applied as a lookup table
+upperCase = np.arange(256,dtype=np.uint8)
+upperCase[ord('a'):ord('z') + 1] -= ord('a') - ord('A')
+readers = ['pyfaidx','mmap']
+class FaidxFasta(object):
+
+	# pyfaidx behind the reader interface: record names, lengths and uint8 bytes of [start,end) intervals
+	def __init__(self,path,longNames=False):
+		self.fasta = px.Fasta(path,duplicate_action='first',sequence_always_upper=True,read_long_names=longNames)
+
+	def keys(self):
+		return(list(self.fasta.keys()))
+
+	def length(self,name):
+		return(len(self.fasta[name]))
+
+	def bases(self,name,start=0,end=None,fold=False):
+		# Already upper case, fold is only there for MappedFasta
+		seq = self.fasta[name][start:end if(end is not None) else len(self.fasta[name])].seq
+		return(np.frombuffer(seq if(isinstance(seq,bytes)) else seq.encode('ascii'),dtype=np.uint8))
+class MappedFasta(object):
+
+	# Whole file memory-mapped and read through a faidx index: an up-to-date .fai is reused, otherwise one is built from buffered
+	# reads and saved next to the file. As with faidx, every line of a record but the last must have the same width
+	def __init__(self,path,longNames=False):
+		self.handle = open(path,'rb')
+		self.data = mmap.mmap(self.handle.fileno(),0,access=mmap.ACCESS_READ)
+		self.buffer = np.frombuffer(self.data,dtype=np.uint8)
+		# name -> (first sequence byte, bases, bases per line, bytes per line)
+		self.index = dict()
+		self.names = list()
+
+		entries = readIndex(path)
+		if(entries is None):
+			entries = buildIndex(path)
+			writeIndex(path,entries)
+		for name,length,offset,lineBases,lineBytes in entries:
+			name = headerLine(self.handle,offset) if(longNames) else name
+			if(name not in self.index):
+				self.index[name] = (offset,length,lineBases,lineBytes)
+				self.names.append(name)
+
+	def keys(self):
+		return(list(self.names))
+
+	def length(self,name):
+		return(self.index[name][1])
+
+	def bases(self,name,start=0,end=None,fold=False):
+		# A view of the file when the interval is on one line, a single copy without line breaks otherwise (and one more to fold)
+		offset,length,lineBases,lineBytes = self.index[name]
+		start,end = max(0,start),length if(end is None) else min(end,length)
+		if(end <= start):
+			return(np.zeros(0,dtype=np.uint8))
+
+		first,last = start // lineBases,(end - 1) // lineBases
+		if(first == last):
+			begin = offset + first * lineBytes + start % lineBases
+			seq = self.buffer[begin:begin + end - start]
+		else:
+			# Full lines through a strided view that skips line breaks and the part of the last line, copied into one buffer
+			lines = np.lib.stride_tricks.as_strided(self.buffer[offset + first * lineBytes:],shape=(last - first,lineBases),strides=(lineBytes,1))
+			tail = offset + last * lineBytes
+			full = np.empty((last - first) * lineBases + end - last * lineBases,dtype=np.uint8)
+			full[:(last - first) * lineBases].reshape(last - first,lineBases)[:] = lines
+			full[(last - first) * lineBases:] = self.buffer[tail:tail + end - last * lineBases]
+			seq = full[start % lineBases:]
+
+		return(upperCase.take(seq) if(fold) else seq)
+
+	def close(self):
+		self.buffer = None
+		self.data.close()
+		self.handle.close()
+def readIndex(path):
+	# Entries of path.fai (name, length, offset, bases and bytes per line) if it is there and not older than the FASTA
+	fai = path + '.fai'
+	try:
+		if(os.path.getmtime(fai) < os.path.getmtime(path)):
+			return(None)
+		entries = [line.rstrip('\n').split('\t') for line in open(fai)]
+		return([(fields[0],int(fields[1]),int(fields[2]),int(fields[3]),int(fields[4])) for fields in entries if(len(fields) >= 5)])
+	except (IOError,OSError,ValueError):
+		return(None)
+def buildIndex(path):
+	# One pass of buffered line reads, nothing goes through the mapping. Every line of a record has the width of the first
+	# but the last, which may be shorter. Trailing blank lines do not count
+	entries = list()
+	record = None
+	position = 0
+	for line in open(path,'rb'):
+		if(line.startswith(b'>')):
+			record = [line[1:].decode('ascii').split()[0],0,position + len(line),0,0,False,False]
+			entries.append(record)
+		elif(record is not None):
+			name,length,offset,lineBases,lineBytes,short,blank = record
+			bases = len(line.rstrip(b'\r\n'))
+			if(bases == 0):
+				record[6] = True
+			elif(blank or short or (lineBases and bases > lineBases)):
+				raise ValueError('Lines of different width in record ' + name)
+			else:
+				if(lineBases == 0):
+					record[3],record[4] = bases,len(line)
+				record[1] += bases
+				record[5] = bases < record[3] or len(line) != record[4]
+		position += len(line)
+
+	return([tuple(record[:5]) for record in entries])
+def writeIndex(path,entries):
+	# Saved next to the FASTA as samtools and pyfaidx do, written in place by a rename. A read-only directory only costs the next build
+	try:
+		handle,staging = tempfile.mkstemp(prefix='.fai',dir=os.path.dirname(os.path.abspath(path)))
+		f = os.fdopen(handle,'w')
+		f.write(''.join(['\t'.join([str(field) for field in entry]) + '\n' for entry in entries]))
+		f.close()
+		os.rename(staging,path + '.fai')
+	except (IOError,OSError):
+		pass
+def headerLine(handle,offset,window=4096):
+	# Full header of the record whose sequence starts at offset: the line just before it, read backwards in growing windows
+	while(True):
+		begin = max(0,offset - window)
+		handle.seek(begin)
+		chunk = handle.read(offset - begin)
+		lineStart = chunk.rfind(b'\n',0,len(chunk) - 1) + 1
+		if(lineStart > 0 or begin == 0):
+			return(chunk[lineStart + 1:].decode('ascii').rstrip())
+		window *= 2
+def openFasta(path,reader='pyfaidx',longNames=False):
+	return(MappedFasta(path,longNames) if(reader == 'mmap') else FaidxFasta(path,longNames))
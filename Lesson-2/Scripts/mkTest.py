@@ -0,0 +1,68 @@
+import numpy as np
+
+# Results table columns, one row per gene
+mkColumns = ['Pi','P0','Di','D0','mi','m0','Ka','Ks','omega','alpha','fisherP','alphaFWW','alphaAsymptotic','asymptoticModel']
+# Decay rates tried when fitting alpha(x) = a + b * exp(-c * x), and DAF bins with P0 > 0 needed for any fit
+decayRates = np.logspace(-2,3,501)
+minimumBins = 3
+def ratio(numerator,denominator):
+	return(numerator / float(denominator) if(denominator != 0) else float('nan'))
+def fisherExact(table):
+
+	# Two-sided Fisher's exact test of a 2x2 table [[a,b],[c,d]]: sum of the tables at least as unlikely as the observed one, as R does.
+	# Projected (expected) counts are rounded
+	(a,b),(c,d) = [[int(round(value)) for value in row] for row in table]
+	row,column,total = a + b,a + c,a + b + c + d
+	low,high = max(0,row + column - total),min(row,column)
+	if(low == high):
+		return(1.0)
+
+	# Hypergeometric log-probabilities up to a constant, from the ratio of consecutive terms
+	k = np.arange(low,high,dtype=np.float64)
+	steps = np.log(row - k) + np.log(column - k) - np.log(k + 1) - np.log(total - row - column + k + 1)
+	logP = np.concatenate([[0.0],np.cumsum(steps)])
+	p = np.exp(logP - logP.max())
+	observed = p[a - low]
+
+	return(min(1.0,p[p <= observed * (1 + 1e-7)].sum() / p.sum()))
+def standardMK(Pi,P0,Di,D0):
+
+	# alpha = 1 - (D0 Pi) / (Di P0), with 0-fold as selected (i) and 4-fold as neutral (0) class
+	return(1 - ratio(D0 * Pi,Di * P0),fisherExact([[Pi,P0],[Di,D0]]))
+def fwwAlpha(daf,Pi,P0,Di,D0,cutoff=0.15):
+
+	# Fay, Wyckoff and Wu: polymorphism in DAF bins at or below the cutoff is left out, as iMKT FWW does
+	above = daf > cutoff
+
+	return(1 - ratio(D0 * Pi[above].sum(),Di * P0[above].sum()))
+def asymptoticAlpha(daf,Pi,P0,Di,D0):
+
+	# alpha(x) per DAF bin extrapolated to x = 1 (Messer and Petrov 2013). Exponential fit, linear if it cannot be fitted.
+	# Below minimumBins bins with 4-fold polymorphism there is no estimate, a line through two points is not one
+	valid = P0 > 0
+	if(Di == 0 or valid.sum() < minimumBins):
+		return(float('nan'),'')
+	x = daf[valid]
+	alpha = 1 - (D0 / float(Di)) * (Pi[valid] / P0[valid].astype(np.float64))
+
+	# For a fixed decay rate a and b are a linear least squares fit. The rate with the lowest residuals wins
+	best = None
+	for c in decayRates:
+		design = np.column_stack([np.ones(x.shape[0]),np.exp(-c * x)])
+		coefficients,residuals,rank,singular = np.linalg.lstsq(design,alpha,rcond=None)
+		sse = ((design.dot(coefficients) - alpha) ** 2).sum()
+		if(rank == 2 and (best is None or sse < best[0])):
+			best = (sse,coefficients[0] + coefficients[1] * np.exp(-c))
+	if(best is None):
+		slope,intercept = np.polyfit(x,alpha,1)
+		return(intercept + slope,'linear')
+
+	return(best[1],'exponential')
+def mkRow(daf,Pi,P0,mi,D0,m0,Di,cutoff=0.15):
+
+	# Binned polymorphism (Pi, P0 per DAF bin) and divergence of one gene
+	alpha,p = standardMK(Pi.sum(),P0.sum(),Di,D0)
+	Ka,Ks = ratio(Di,mi),ratio(D0,m0)
+	asymptotic,model = asymptoticAlpha(daf,Pi,P0,Di,D0)
+
+	return([Pi.sum(),P0.sum(),Di,D0,mi,m0,Ka,Ks,ratio(Ka,Ks),alpha,p,fwwAlpha(daf,Pi,P0,Di,D0,cutoff),asymptotic,model])
@@ -2,308 +2,897 @@ import os
 import sys
 import time
 import argparse
+import multiprocessing
 import numpy as np
-import pandas as pd
-import pyfaidx as px
-def degenerancy(data,codonDict):
-	
-	#DEGENERANCY DICTIONARIES
-	standardDict = {
+from stageProfile import StageProfile,noProfile
+from fastaReader import readers,openFasta
+from alignmentCache import AlignmentCache,contentKey
+from sfsResampling import resamplingModes,resample,quantiles
+from mkTest import mkColumns,mkRow
+from diversityStats import statsColumns,DiversityAccumulator
+
+# Compact allele codes for A/C/G/T, N and gap. Every other byte (IUPAC codes included) is an allele of its own, lower case folded
+baseAlleles = ['A','C','G','T','N','-']
+alleleBytes = np.array([ord(base) for base in baseAlleles] + [b for b in range(256) if(chr(b) not in baseAlleles and not ord('a') <= b <= ord('z'))])
+baseCodes = np.zeros(256,dtype=np.uint8)
+baseCodes[alleleBytes] = np.arange(alleleBytes.shape[0])
+baseCodes[ord('a'):ord('z') + 1] = baseCodes[ord('A'):ord('Z') + 1]
+
+# Number of alignment columns gathered at once by the SFS engine
+columnBlock = 65536
+
+# Output columns in the order expected by iMKT
+dafColumns = ['daf','Pi','P0']
+divColumns = ['mi','D0','m0','Di']
+spectrumColumns = ['n','derived','Pi','P0']
+
+# 20 derived allele frequency bins, labelled by their left edge
+dafBins = np.arange(0.025,1.05,0.05)
+dafLabels = np.arange(0.025,1.0,0.05)
+
+# Files picked up when --batch is a directory
+batchExtensions = ['.fa','.fas','.fasta','.fna']
+
+#DEGENERANCY DICTIONARIES
+standardDict = {
+'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+VertebrateMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '002', 'AGG': '002', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+YeastMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '002', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '004', 'CTG': '004', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+InvertebrateMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+CiliateNuclearDasycladaceanNuclearHexamitaNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+EchinodermMitochondrialFlatwormMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+EuplotidNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '003', 'TGC': '003', 'TGA': '003', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+BacterialArchaealandPlantPlastid = {
+
 	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	VertebrateMitochondrial = {
+AlternativeYeastNuclear = {
 
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '002', 'AGG': '002', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	YeastMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '002', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '004', 'CTG': '004', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	InvertebrateMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	CiliateNuclearDasycladaceanNuclearHexamitaNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	EchinodermMitochondrialFlatwormMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	EuplotidNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '003', 'TGC': '003', 'TGA': '003', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	BacterialArchaealandPlantPlastid = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	AlternativeYeastNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '003', 'CTC': '003', 'CTA': '203', 'CTG': '000', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	AlternativeFlatwormMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '003', 'TAC': '003', 'TAA': '003', 'TAG': '000', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	BlepharismaMacronuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '020', 'TAG': '200', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	ChlorophyceanMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '222', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '020', 'TAG': '020', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	TrematodeMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	ScenedesmusobliquusMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '222', 'TCT': '003', 'TCC': '003', 'TCA': '030', 'TCG': '003', 'TAT': '002', 'TAC': '002', 'TAA': '030', 'TAG': '020', 'TGT': '002', 'TGC': '002', 'TGA': '030', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	ThraustochytriumMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '030', 'TTG': '200', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '032', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '030', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '004', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	PterobranchiaMitochondrial = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '022', 'AGT': '003', 'AGC': '003', 'AGA': '003', 'AGG': '020', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	CandidateDivisionSR1andGracilibacteria = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '200', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '204', 'GGG': '004'}
-	PachysolentannophilusNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '003', 'CTC': '003', 'CTA': '203', 'CTG': '000', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	KaryorelictNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	CondylostomaNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	MesodiniumNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '004', 'TAC': '004', 'TAA': '004', 'TAG': '004', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	PeritrichNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '202', 'GAG': '202', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	BlastocrithidiaNuclear = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '202', 'GAG': '202', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-	BalanophoraceaePlastid = {
-
-		'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '000', 'TAG': '000', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
-
-	if(codonDict == 'standard'):
-		degenerateCodonTable = standardDict
-	elif(codonDict == 'VertebrateMitochondrial'):
-		degenerateCodonTable = VertebrateMitochondrial
-	elif(codonDict == 'YeastMitochondrial'):
-		degenerateCodonTable = YeastMitochondrial
-	elif(codonDict == 'MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma'):
-		degenerateCodonTable = MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma
-	elif(codonDict == 'InvertebrateMitochondrial'):
-		degenerateCodonTable = InvertebrateMitochondrial
-	elif(codonDict == 'CiliateNuclearDasycladaceanNuclearHexamitaNuclear'):
-		degenerateCodonTable = CiliateNuclearDasycladaceanNuclearHexamitaNuclear
-	elif(codonDict == 'EchinodermMitochondrialFlatwormMitochondrial'):
-		degenerateCodonTable = EchinodermMitochondrialFlatwormMitochondrial
-	elif(codonDict == 'EuplotidNuclear'):
-		degenerateCodonTable = EuplotidNuclear
-	elif(codonDict == 'BacterialArchaealandPlantPlastid'):
-		degenerateCodonTable = BacterialArchaealandPlantPlastid
-	elif(codonDict == 'AlternativeYeastNuclear'):
-		degenerateCodonTable = AlternativeYeastNuclear
-	elif(codonDict == 'AlternativeFlatwormMitochondrial'):
-		degenerateCodonTable = AlternativeFlatwormMitochondrial
-	elif(codonDict == 'BlepharismaMacronuclear'):
-		degenerateCodonTable = BlepharismaMacronuclear
-	elif(codonDict == 'ChlorophyceanMitochondrial'):
-		degenerateCodonTable = ChlorophyceanMitochondrial
-	elif(codonDict == 'TrematodeMitochondrial'):
-		degenerateCodonTable = TrematodeMitochondrial
-	elif(codonDict == 'ScenedesmusobliquusMitochondrial'):
-		degenerateCodonTable = ScenedesmusobliquusMitochondrial	
-	elif(codonDict == 'ThraustochytriumMitochondrial'):
-		degenerateCodonTable = ThraustochytriumMitochondrial
-	elif(codonDict == 'PterobranchiaMitochondrial'):
-		degenerateCodonTable = PterobranchiaMitochondrial	
-	elif(codonDict == 'CandidateDivisionSR1andGracilibacteria'):
-		degenerateCodonTable = CandidateDivisionSR1andGracilibacteria
-	elif(codonDict == 'PachysolentannophilusNuclear'):
-		degenerateCodonTable = PachysolentannophilusNuclear
-	elif(codonDict == 'KaryorelictNuclear'):
-		degenerateCodonTable = KaryorelictNuclear
-	elif(codonDict == 'CondylostomaNuclear'):
-		degenerateCodonTable = CondylostomaNuclear
-	elif(codonDict == 'MesodiniumNuclear'):
-		degenerateCodonTable = MesodiniumNuclear
-	elif(codonDict == 'PeritrichNuclear'):
-		degenerateCodonTable = PeritrichNuclear
-	elif(codonDict == 'BlastocrithidiaNuclear'):
-		degenerateCodonTable = BlastocrithidiaNuclear
-	elif(codonDict == 'BalanophoraceaePlastid'):
-		degenerateCodonTable = BalanophoraceaePlastid
-
-
-
-	degenerancy = ''
-	for i in range(0, len(data),3):
-		codon = data[i:i+3]
-		if('N' in codon or '-' in codon):
-			degenerancy += codon
-		else:
-			degenerancy += degenerateCodonTable[codon]
-
-	return(degenerancy)
-def sequencesToMatrix(multiFasta,split=None):
-
-	# Extract samples from fastas
-	samples = list(multiFasta.keys())
-	
-	if(split is None):
-		seqLen = len(multiFasta[samples[0]][:].seq)
-		
-		if((seqLen % 3) != 0):
-			print('cdsLength')
-			sys.exit('cdsLength')
-
-		# Create empty array with ndimesions equal to multi-Fasta lines and length
-		matrix = np.empty([len(samples),len(multiFasta[samples[0]][:].seq)],dtype='str')
-		
-		# List to append indexes if whole sequence at any population is len(seq) * 'N'
-		deleteIndex = list()
-		
-		# Iter fasta to add sequence to matrix
-		for i in range(1,len(samples),1):
-			# Extract each sample sequence
-			tmp = multiFasta[samples[i]][:].seq
-			if(len(tmp) != seqLen):
-				print('errorAlign')
-				sys.exit('errorAlign')
-
-			# if('N' in tmp):
-			if('N'*len(tmp) == tmp):
-				deleteIndex.append(i)
-			else:
-				matrix[i] = list(tmp)
-		
-		# Delete lines
-		matrix = np.delete(matrix,deleteIndex,0)
-		
-		degenCode = degenerancy(multiFasta[samples[0]][:].seq,args.codonTable)
-		# Put degenerancy in first ndarray element
-		matrix[0] = list(degenCode)
-		# NEED TO SOLVE THIS. C-contigous change web subset, need true in order to inter properly witih nditer
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '003', 'CTC': '003', 'CTA': '203', 'CTG': '000', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+AlternativeFlatwormMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '003', 'TAC': '003', 'TAA': '003', 'TAG': '000', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+BlepharismaMacronuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '020', 'TAG': '200', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+ChlorophyceanMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '222', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '020', 'TAG': '020', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+TrematodeMitochondrial = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '002', 'ATC': '002', 'ATA': '002', 'ATG': '002', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '003', 'AAC': '003', 'AAA': '003', 'AAG': '000', 'AGT': '004', 'AGC': '004', 'AGA': '004', 'AGG': '004', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+ScenedesmusobliquusMitochondrial = {
 
-		matrix = np.asarray(matrix[:,(matrix[0]=='0') | (matrix[0]=='4')],order='C')
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '222', 'TCT': '003', 'TCC': '003', 'TCA': '030', 'TCG': '003', 'TAT': '002', 'TAC': '002', 'TAA': '030', 'TAG': '020', 'TGT': '002', 'TGC': '002', 'TGA': '030', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+ThraustochytriumMitochondrial = {
 
-		return(matrix)
+	'TTT': '002', 'TTC': '002', 'TTA': '030', 'TTG': '200', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '032', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '030', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '004', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+PterobranchiaMitochondrial = {
 
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '004', 'CGG': '004', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '022', 'AGT': '003', 'AGC': '003', 'AGA': '003', 'AGG': '020', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+CandidateDivisionSR1andGracilibacteria = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '002', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '200', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '204', 'GGG': '004'}
+PachysolentannophilusNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '002', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '022', 'TAG': '002', 'TGT': '002', 'TGC': '002', 'TGA': '020', 'TGG': '000', 'CTT': '003', 'CTC': '003', 'CTA': '203', 'CTG': '000', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+KaryorelictNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+CondylostomaNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '202', 'CAG': '202', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+MesodiniumNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '004', 'TAC': '004', 'TAA': '004', 'TAG': '004', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+PeritrichNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '202', 'GAG': '202', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+BlastocrithidiaNuclear = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '202', 'TAG': '202', 'TGT': '002', 'TGC': '002', 'TGA': '002', 'TGG': '002', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '202', 'GAG': '202', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+BalanophoraceaePlastid = {
+
+	'TTT': '002', 'TTC': '002', 'TTA': '202', 'TTG': '202', 'TCT': '004', 'TCC': '004', 'TCA': '004', 'TCG': '004', 'TAT': '002', 'TAC': '002', 'TAA': '000', 'TAG': '000', 'TGT': '002', 'TGC': '002', 'TGA': '000', 'TGG': '000', 'CTT': '004', 'CTC': '004', 'CTA': '204', 'CTG': '204', 'CCT': '004', 'CCC': '004', 'CCA': '004', 'CCG': '004', 'CAT': '002', 'CAC': '002', 'CAA': '002', 'CAG': '002', 'CGT': '004', 'CGC': '004', 'CGA': '204', 'CGG': '204', 'ATT': '003', 'ATC': '003', 'ATA': '003', 'ATG': '000', 'ACT': '004', 'ACC': '004', 'ACA': '004', 'ACG': '004', 'AAT': '002', 'AAC': '002', 'AAA': '002', 'AAG': '002', 'AGT': '002', 'AGC': '002', 'AGA': '202', 'AGG': '202', 'GTT': '004', 'GTC': '004', 'GTA': '004', 'GTG': '004', 'GCT': '004', 'GCC': '004', 'GCA': '004', 'GCG': '004', 'GAT': '002', 'GAC': '002', 'GAA': '002', 'GAG': '002', 'GGT': '004', 'GGC': '004', 'GGA': '004', 'GGG': '004'}
+
+# Codon tables by name, in the order offered by --codonTable
+codonTableNames = ['standard','VertebrateMitochondrial','YeastMitochondrial','MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma','InvertebrateMitochondrial','CiliateNuclearDasycladaceanNuclearHexamitaNuclear','EchinodermMitochondrialFlatwormMitochondrial','EuplotidNuclear','BacterialArchaealandPlantPlastid','AlternativeYeastNuclear','AlternativeFlatwormMitochondrial','BlepharismaMacronuclear','ChlorophyceanMitochondrial','TrematodeMitochondrial','ScenedesmusobliquusMitochondrial','ThraustochytriumMitochondrial','PterobranchiaMitochondrial','CandidateDivisionSR1andGracilibacteria','PachysolentannophilusNuclear','KaryorelictNuclear','CondylostomaNuclear','MesodiniumNuclear','PeritrichNuclear','BlastocrithidiaNuclear','BalanophoraceaePlastid']
+codonTables = dict(zip(codonTableNames,[standardDict,VertebrateMitochondrial,YeastMitochondrial,MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma,InvertebrateMitochondrial,CiliateNuclearDasycladaceanNuclearHexamitaNuclear,EchinodermMitochondrialFlatwormMitochondrial,EuplotidNuclear,BacterialArchaealandPlantPlastid,AlternativeYeastNuclear,AlternativeFlatwormMitochondrial,BlepharismaMacronuclear,ChlorophyceanMitochondrial,TrematodeMitochondrial,ScenedesmusobliquusMitochondrial,ThraustochytriumMitochondrial,PterobranchiaMitochondrial,CandidateDivisionSR1andGracilibacteria,PachysolentannophilusNuclear,KaryorelictNuclear,CondylostomaNuclear,MesodiniumNuclear,PeritrichNuclear,BlastocrithidiaNuclear,BalanophoraceaePlastid]))
+def compileCodonTable(table):
+
+	# Degeneracy of the three codon positions indexed by the 2-bit codon code. Last row is the N/gap sentinel
+	lookup = np.full([65,3],255,dtype=np.uint8)
+	for codon,degen in table.items():
+		lookup[16*baseCodes[ord(codon[0])] + 4*baseCodes[ord(codon[1])] + baseCodes[ord(codon[2])]] = [int(d) for d in degen]
+
+	return(lookup)
+
+# Compile every genetic code once at import
+degeneracyTables = dict((name,compileCodonTable(table)) for name,table in codonTables.items())
+def degeneracyCodes(sequences,codonTable):
+
+	# Accept one sequence, a list of sequences or a samples x sites code matrix
+	if(isinstance(sequences,(str,bytes))):
+		return(degeneracyCodes([sequences],codonTable)[0])
+	elif(isinstance(sequences,np.ndarray)):
+		codes = sequences
 	else:
-		# Create empty array with ndimesions equal to multi-Fasta lines and length
-		splitC = [split[0],split[1]]
-		matrix = np.empty([len(samples),(splitC[1]-splitC[0]+1)],dtype='str')
-		
-		# List to append indexes if whole sequence at any population is len(seq) * 'N'
-		deleteIndex = list()
-		
-		# Iter fasta to add sequence to matrix
-		for i in range(1,len(samples),1):
-			# Extract each sample sequence
-			tmp = multiFasta.get_spliced_seq(samples[i], [splitC]).seq
-			if(tmp == ('N' * len(tmp))):
-				deleteIndex.append(i)
-			else:
-				matrix[i] = list(tmp)
-		
-		# Delete lines
-		matrix = np.delete(matrix,deleteIndex,0)
-		
-		degenCode = degenerancy(multiFasta.get_spliced_seq(samples[0], [splitC]).seq.upper(),args.codonTable)
-		# Put degenerancy in first ndarray element
-		matrix[0] = list(degenCode)
-		# NEED TO SOLVE THIS. C-contigous change web subset, need true in order to inter properly witih nditer
-
-		matrix = np.asarray(matrix[:,(matrix[0]=='0') | (matrix[0]=='4')],order='C')  
-
-		return(matrix)
+		# Annotate every sequence in a single gather, each one starting on its own codon boundary
+		sequences = [np.frombuffer(seq if(isinstance(seq,bytes)) else seq.encode('ascii'),dtype=np.uint8) for seq in sequences]
+		lengths = [seq.shape[0] for seq in sequences]
+		padded = [3 * (-(-length // 3)) for length in lengths]
+		raw = np.full(sum(padded),ord('N'),dtype=np.uint8)
+		starts = np.cumsum([0] + padded)
+		for seq,begin in zip(sequences,starts):
+			raw[begin:begin+seq.shape[0]] = seq
+		degen = degeneracyCodes(baseCodes[raw][np.newaxis],codonTable)[0]
+		return([degen[begin:begin+length] for begin,length in zip(starts,lengths)])
+
+	# Codon code from three 2-bit allele codes, anything outside A/C/G/T falls to the sentinel row
+	nCodons = codes.shape[-1] // 3
+	codons = codes[...,:3*nCodons].reshape(codes.shape[:-1] + (nCodons,3)).astype(np.intp)
+	index = 16*codons[...,0] + 4*codons[...,1] + codons[...,2]
+	index[(codons > 3).any(axis=-1)] = 64
+
+	degen = np.full(codes.shape,255,dtype=np.uint8)
+	degen[...,:3*nCodons] = degeneracyTables[codonTable][index].reshape(codes.shape[:-1] + (3*nCodons,))
+	return(degen)
+def degenerancy(data,codonDict):
+
+	# Degeneracy digits as a string, codons with N or gaps are copied as they are
+	raw = np.frombuffer(data if(isinstance(data,bytes)) else data.encode('ascii'),dtype=np.uint8)
+	degen = degeneracyCodes(baseCodes[raw][np.newaxis],codonDict)[0]
+	output = np.where(degen == 255,raw,degen + ord('0')).astype(np.uint8)
+
+	return(output.tobytes().decode('ascii'))
+class AlignmentMatrix(object):
+
+	# Samples as uint8 allele codes (reference row excluded, outgroup last) and reference degeneracy per column
+	def __init__(self,samples,codes,degen):
+		self.samples = samples
+		self.codes = codes
+		self.degen = degen
+		# 0-fold and 4-fold columns are kept as an index over the full matrix instead of a copied subset
+		self.sites = np.flatnonzero((degen == 0) | (degen == 4))
+
+	@property
+	def shape(self):
+		# Same layout as the former character matrix: degeneracy row, samples and selected columns
+		return((self.codes.shape[0] + 1,self.sites.shape[0]))
+
+	def blocks(self,size=None):
+		# Gather selected columns in bounded blocks so no full-size copy is ever made
+		size = size or columnBlock
+		for i in range(0,self.sites.shape[0],size):
+			columns = self.sites[i:i+size]
+			yield(columns,self.codes.take(columns,axis=1))
+
+	def siteCounts(self):
+		# Number of 0-fold (mi) and 4-fold (m0) sites
+		return(np.count_nonzero(self.degen == 0),np.count_nonzero(self.degen == 4))
+def encodeSequences(sequences,nSamples,seqLen,dropMissing=True):
+
+	# One byte per site and sample
+	codes = np.empty([nSamples,seqLen],dtype=np.uint8)
+	kept = list()
+
+	# Iter (sample, uint8 bytes) pairs to add sequence to matrix. Lower case is folded by the lookup table
+	for sample,tmp in sequences:
+		if(len(tmp) != seqLen):
+			print('errorAlign')
+			sys.exit('errorAlign')
+
+		row = codes[len(kept)]
+		np.take(baseCodes,tmp,out=row)
+
+		# Skip samples whose whole sequence is N
+		if(not (dropMissing and (row == baseCodes[ord('N')]).all())):
+			kept.append(sample)
+
+	return(kept,codes[:len(kept)])
+def sequencesToMatrix(multiFasta,split=None,codonTable='standard'):
+
+	# Extract samples from fastas. multiFasta is a fastaReader backend
+	samples = multiFasta.keys()
+
+	# Reference is read once, it is only used to annotate degeneracy. split is a 1-based closed interval
+	begin,end = (0,None) if(split is None) else (split[0] - 1,split[1])
+	reference = multiFasta.bases(samples[0],begin,end)
+	if(split is None and (len(reference) % 3) != 0):
+		print('cdsLength')
+		sys.exit('cdsLength')
+
+	# Extract each sample sequence
+	sequences = ((sample,multiFasta.bases(sample,begin,end)) for sample in samples[1:])
+	kept,codes = encodeSequences(sequences,len(samples) - 1,len(reference))
+
+	# Codons with N or gaps get the 255 sentinel
+	degen = degeneracyCodes(baseCodes[reference],codonTable)
+
+	return(AlignmentMatrix(kept,codes,degen))
+def missingSample(multiFasta,sample,window):
+
+	# True if the whole record is N, stops at the first window with a called base
+	for begin in range(0,multiFasta.length(sample),window):
+		if((baseCodes[multiFasta.bases(sample,begin,begin + window)] != baseCodes[ord('N')]).any()):
+			return(False)
+
+	return(True)
+def alignmentChunks(multiFasta,codonTable,window=None):
+
+	# Whole alignment at once, or codon-aligned windows of columns. Yields (first column, AlignmentMatrix)
+	if(window is None):
+		multiFastaMatrix = sequencesToMatrix(multiFasta,codonTable=codonTable)
+
+		# Check if there is more than 2 individuals to extract polymorphism
+		if(multiFastaMatrix.shape[0] < 4):
+			print('numberOfLines')
+			sys.exit('numberOfLines')
+
+		yield(0,multiFastaMatrix)
+		return
+
+	# Extract samples from fastas. Lengths come from the index, nothing is read yet
+	samples = multiFasta.keys()
+	seqLen = multiFasta.length(samples[0])
+	if((seqLen % 3) != 0):
+		print('cdsLength')
+		sys.exit('cdsLength')
+	if(any(multiFasta.length(sample) != seqLen for sample in samples[1:])):
+		print('errorAlign')
+		sys.exit('errorAlign')
+
+	# Windows start on codon boundaries so degeneracy can be annotated window by window
+	window = max(3,window - (window % 3))
+	kept = [sample for sample in samples[1:] if(not missingSample(multiFasta,sample,window))]
+
+	# Check if there is more than 2 individuals to extract polymorphism
+	if(len(kept) + 1 < 4):
+		print('numberOfLines')
+		sys.exit('numberOfLines')
+
+	# Only one window of the matrix is held at a time
+	for begin in range(0,seqLen,window):
+		end = min(begin + window,seqLen)
+		sequences = ((sample,multiFasta.bases(sample,begin,end)) for sample in kept)
+		kept,codes = encodeSequences(sequences,len(kept),end - begin,dropMissing=False)
+		yield(begin,AlignmentMatrix(kept,codes,degeneracyCodes(baseCodes[multiFasta.bases(samples[0],begin,end)],codonTable)))
+def cachedChunks(cached,window=None):
+
+	# Windows of a cached entry are views of the memory-mapped arrays, only the selected columns are ever read
+	samples,codes,degen = cached
+	if(window is None):
+		yield(0,AlignmentMatrix(samples,codes,degen))
+		return
+
+	window = max(3,window - (window % 3))
+	for begin in range(0,codes.shape[1],window):
+		yield(begin,AlignmentMatrix(samples,codes[:,begin:begin+window],degen[begin:begin+window]))
+def cachingChunks(chunks,cache,key,seqLen):
+
+	# Chunks are copied into a new cache entry as they are used. The entry is only kept if the whole alignment was read
+	staging = None
+	try:
+		for begin,chunk in chunks:
+			if(staging is None):
+				staging,codes,degen = cache.create((chunk.codes.shape[0],seqLen))
+			codes[:,begin:begin+chunk.codes.shape[1]] = chunk.codes
+			degen[begin:begin+chunk.degen.shape[0]] = chunk.degen
+			yield(begin,chunk)
+		cache.commit(key,staging,chunk.samples,codes,degen)
+		staging = None
+	finally:
+		if(staging is not None):
+			cache.discard(staging)
+def fileChunks(multiFasta,codonTable,window=None,profile=noProfile,cache=None,reader='pyfaidx'):
+
+	# Cached alignments skip FASTA parsing, encoding and degeneracy altogether
+	with profile.stage('index'):
+		if(cache is not None):
+			key = contentKey(multiFasta,codonTable)
+			cached = cache.load(key)
+			if(cached is not None):
+				profile.count('index','cacheHits',1)
+				return(profiledChunks(cachedChunks(cached,window),profile))
+		file = openFasta(multiFasta,reader,longNames=True)
+
+	chunks = alignmentChunks(file,codonTable,window)
+	if(cache is not None):
+		profile.count('index','cacheMisses',1)
+		chunks = cachingChunks(chunks,cache,key,file.length(file.keys()[0]))
+
+	return(profiledChunks(chunks,profile))
+def alleleCounts(pol,outgroups=None):
+	# Allele counts per column, one row per code: A/C/G/T, N and gap always, then every other code found in the samples or outgroups
+	present = np.bincount(pol.ravel(),minlength=alleleBytes.shape[0])
+	if(outgroups is not None):
+		present += np.bincount(outgroups.ravel(),minlength=alleleBytes.shape[0])
+	alleles = np.union1d(np.arange(len(baseAlleles)),np.flatnonzero(present))
+
+	return(alleles,np.vstack([(pol == code).sum(axis=0) for code in alleles]))
+def sfsArrays(pol,ancestral,missing=False,counted=None):
+
+	# counted (alleles, counts) from alleleCounts can be shared with other statistics, counts are modified here
+	nSamples = pol.shape[0]
+	columns = np.arange(pol.shape[1])
+	alleles,counts = alleleCounts(pol,ancestral[np.newaxis]) if(counted is None) else counted
+	row = np.zeros(alleleBytes.shape[0],dtype=np.intp)
+	row[alleles] = np.arange(alleles.shape[0])
+	ancestral = row[ancestral]
+
+	# Undefined ancestral allele or N/gap in any ingroup sample. With missing, N/gap samples are just left out
+	valid = (ancestral != baseCodes[ord('N')]) & (ancestral != baseCodes[ord('-')])
+	if(missing):
+		counts[baseCodes[ord('N')]] = 0
+		counts[baseCodes[ord('-')]] = 0
+		valid &= counts.sum(axis=0) > 0
+	else:
+		valid &= (counts[baseCodes[ord('N')]] == 0) & (counts[baseCodes[ord('-')]] == 0)
+
+	ancestralCount = counts[ancestral,columns]
+	nAlleles = (counts > 0).sum(axis=0)
+
+	# Fixed differences: monomorphic ingroup not carrying the ancestral allele
+	div = valid & (nAlleles == 1) & (ancestralCount == 0)
+
+	# Segregating sites: derived allele is the first non-ancestral allele in byte order, as np.unique ordering did
+	polymorphic = valid & (nAlleles > 1) & (ancestralCount > 0)
+	counts[ancestral,columns] = 0
+	counts = counts[np.argsort(alleleBytes[alleles],kind='mergesort')]
+	derived = counts[(counts > 0).argmax(axis=0),columns]
+	derived[~polymorphic] = 0
+
+	return(div | polymorphic,derived,div)
+def diversityArrays(counts,nSamples):
+
+	# Columns with every ingroup sample called, whether they segregate and their pairwise diversity n/(n-1) (1 - sum p^2).
+	# Rows of N and gap are the same as their codes
+	complete = (counts[baseCodes[ord('N')]] == 0) & (counts[baseCodes[ord('-')]] == 0)
+	alleles = np.delete(counts,[baseCodes[ord('N')],baseCodes[ord('-')]],axis=0)
+	segregating = (alleles > 0).sum(axis=0) > 1
+	pairwise = (nSamples ** 2 - (alleles.astype(np.float64) ** 2).sum(axis=0)) / (nSamples * (nSamples - 1.0))
+
+	return(complete,segregating,pairwise)
+def consensusAllele(outgroups):
+
+	# Allele carried by every outgroup. Columns where an outgroup is missing or they disagree get N and are left unpolarized
+	ancestral = outgroups[0].copy()
+	ancestral[(outgroups != outgroups[0]).any(axis=0)] = baseCodes[ord('N')]
+
+	return(ancestral)
+def projectionProbabilities(called,derived,n):
+
+	# Hypergeometric probability of k = 0..n derived alleles in n of the called samples, computed once per (called, derived) pair
+	top = called.max()
+	logFactorial = np.concatenate([[0.0],np.cumsum(np.log(np.arange(1,top + 1)))])
+	def logChoose(a,b):
+		a,b = np.broadcast_arrays(a,b)
+		valid = (b >= 0) & (b <= a)
+		values = np.full(a.shape,-np.inf)
+		values[valid] = logFactorial[a[valid]] - logFactorial[b[valid]] - logFactorial[a[valid] - b[valid]]
+		return(values)
+
+	pairs,inverse = np.unique(called * (top + 1) + derived,return_inverse=True)
+	m,d = (pairs // (top + 1))[:,np.newaxis],(pairs % (top + 1))[:,np.newaxis]
+	k = np.arange(n + 1)[np.newaxis,:]
+
+	return(np.exp(logChoose(d,k) + logChoose(m - d,n - k) - logChoose(m,n)),inverse.reshape(-1))
 def uSfsFromFasta(sequenceMatrix):
 	output = list()
-	for x in np.nditer(sequenceMatrix, order='F',flags=['external_loop']): 
-		degen = x[0]
-		AA = x[-1]
-
-		# Undefined Ancestra Allele. Try to clean out of the loop
-		if(AA == 'N' or AA == '-'):
-			next
-		elif('N' in x[1:-1] or '-' in x[1:-1]):
-			next
-		# Monomorphic sites. Try to clean out of the loop
-		elif(np.unique(x[1:][np.where(x[1:]!='N')]).shape[0] == 1):
-			next
-		else:
-			pol = x[1:-1]
-			if(degen == '4'):
-				functionalClass = '4fold'
-			else:
-				functionalClass = '0fold'
 
-			# Check if pol != AA and monomorphic
-			if((np.unique(pol).shape[0] == 1) and (np.unique(pol)[0] != AA)):
-				div = 1; AF = 0
-				tmp = [AF,div,functionalClass]
-				output.append(tmp)
-			else:
-				AN = x[1:-1].shape[0]
-				AC = pd.DataFrame(data=np.unique(x[1:-1], return_counts=True)[1],index=np.unique(x[1:-1], return_counts=True)[0])
-				div = 0
-				if(AA not in AC.index):
-					next
-				else:
-					AC = AC[AC.index!=AA]
-					if(len(AC) == 0):
-						next
-					else:
-						AF = AC.iloc[0]/AN
-						AF = AF.iloc[0]
-				tmp = [AF,div,functionalClass]
-				output.append(tmp)
+	# Last row is the outgroup (ancestral allele)
+	AN = float(sequenceMatrix.codes.shape[0] - 1)
+	for columns,block in sequenceMatrix.blocks():
+		keep,derived,div = sfsArrays(block[:-1],block[-1])
+		functionalClass = np.where(sequenceMatrix.degen[columns] == 4,'4fold','0fold')
+		output.extend([[(AC / AN) if(d == 0) else 0,int(d),fc] for AC,d,fc in zip(derived[keep].tolist(),div[keep].tolist(),functionalClass[keep].tolist())])
+
 	return(output)
+def dafEdges(bins=None,edges=None):
+
+	# Right-closed bin edges: custom edges, N equal bins centred on multiples of 1/N, or the former 20 bins
+	if(edges is not None):
+		edges = np.array(edges,dtype=np.float64)
+		if(edges.shape[0] < 2 or (np.diff(edges) <= 0).any()):
+			raise ValueError('DAF bin edges must be at least two increasing values')
+		return(edges)
+	if(bins is None or bins == len(dafLabels)):
+		return(dafBins)
+	if(bins < 1):
+		raise ValueError('The number of DAF bins must be at least 1')
+
+	return((np.arange(bins + 1) + 0.5) / bins)
+def dafBin(frequency,edges=dafBins):
+
+	# Index of the (left,right] DAF bin as pd.cut assigned it, -1 outside the bins
+	index = np.searchsorted(edges,frequency,side='left') - 1
+	index[(index < 0) | (index >= edges.shape[0] - 1)] = -1
+
+	return(index)
+class SfsAccumulator(object):
+
+	# Exact derived allele count spectrum per functional class and divergence/site counts for one or more genes.
+	# Binned DAF is derived from the spectrum when written. Chunks and genes are merged by summing.
+	# The last outgroups rows are outgroups, polarized by their consensus or by each of them (one block of groups per outgroup).
+	# With a projection every column with at least that many called ingroup samples is down-sampled hypergeometrically.
+	# With statistics, pi, theta and Tajima's D inputs are kept per gene, and per bins of windowStep columns with a windowStep
+	def __init__(self,nGroups=1,nSamples=None,outgroups=1,ancestral='consensus',projection=None,statistics=False,windowStep=None):
+		self.nGenes = nGroups
+		self.diversity = DiversityAccumulator(nGroups) if(statistics) else None
+		self.windowStep = windowStep
+		self.windowBins = DiversityAccumulator() if(windowStep is not None) else None
+		self.length = 0
+		self.outgroups = outgroups
+		self.ancestral = ancestral
+		self.projection = projection
+		self.polarizations = [None] if(ancestral == 'consensus') else list(range(outgroups))
+		self.dtype = np.int64 if(projection is None) else np.float64
+		nGroups *= len(self.polarizations)
+
+		self.nSamples = None
+		self.unfoldedPi = np.zeros([nGroups,0],dtype=self.dtype)
+		self.unfoldedP0 = np.zeros([nGroups,0],dtype=self.dtype)
+		self.mi = np.zeros(nGroups,dtype=np.int64)
+		self.D0 = np.zeros(nGroups,dtype=self.dtype)
+		self.m0 = np.zeros(nGroups,dtype=np.int64)
+		self.Di = np.zeros(nGroups,dtype=self.dtype)
+		self.segregating = np.zeros(nGroups,dtype=self.dtype)
+		if(projection is not None or nSamples is not None):
+			self.setSamples(nSamples if(projection is None) else projection)
+
+	def setSamples(self,nSamples):
+		# Spectra have one entry per derived allele count, 0 to nSamples. Chunks of one alignment always share it
+		if(self.nSamples is None):
+			self.nSamples = nSamples
+			self.unfoldedPi = np.zeros([self.mi.shape[0],nSamples + 1],dtype=self.dtype)
+			self.unfoldedP0 = np.zeros([self.mi.shape[0],nSamples + 1],dtype=self.dtype)
+		elif(self.nSamples != nSamples):
+			raise ValueError('Spectra of %d and %d samples cannot be combined' % (self.nSamples,nSamples))
+
+	def addSites(self,fourFold,derived,div,polymorphic,group=None):
+		# One entry per 0/4-fold site with its derived allele count. Sites with a negative group are ignored
+		nGroups,nCounts = self.unfoldedPi.shape
+		if(group is None):
+			group = np.zeros(fourFold.shape[0],dtype=np.intp)
+		inside = group >= 0
+		polymorphic = inside & polymorphic
+		self.segregating += np.bincount(group[polymorphic],minlength=nGroups)
+
+		self.mi += np.bincount(group[inside & ~fourFold],minlength=nGroups)
+		self.m0 += np.bincount(group[inside & fourFold],minlength=nGroups)
+		self.Di += np.bincount(group[inside & div & ~fourFold],minlength=nGroups)
+		self.D0 += np.bincount(group[inside & div & fourFold],minlength=nGroups)
+		self.unfoldedPi += np.bincount((group * nCounts + derived)[polymorphic & ~fourFold],minlength=nGroups * nCounts).reshape(nGroups,nCounts)
+		self.unfoldedP0 += np.bincount((group * nCounts + derived)[polymorphic & fourFold],minlength=nGroups * nCounts).reshape(nGroups,nCounts)
+
+	def addProjected(self,fourFold,called,derived,div,keep,group):
+		# Expected counts in a sample of n: k = n derived alleles is a fixed difference, 0 < k < n a segregating site
+		nGroups,n = self.mi.shape[0],self.nSamples
+		inside = group >= 0
+		self.mi += np.bincount(group[inside & ~fourFold],minlength=nGroups)
+		self.m0 += np.bincount(group[inside & fourFold],minlength=nGroups)
+		used = inside & keep & (called >= n)
+		if(not used.any()):
+			return
+
+		# Sites per (group, class) and (called, derived) pair, then one product with the pair probabilities
+		probabilities,pair = projectionProbabilities(called[used],np.where(div,called,derived)[used],n)
+		nPairs = probabilities.shape[0]
+		row = group[used] * 2 + fourFold[used]
+		sites = np.bincount(row * nPairs + pair,minlength=nGroups * 2 * nPairs).reshape(nGroups * 2,nPairs)
+		expected = sites.dot(probabilities)
+
+		self.Di += expected[0::2,n]
+		self.D0 += expected[1::2,n]
+		expected[:,0] = 0
+		expected[:,n] = 0
+		self.unfoldedPi += expected[0::2]
+		self.unfoldedP0 += expected[1::2]
+		self.segregating += expected.reshape(nGroups,-1).sum(axis=1)
+
+	def addBlock(self,block,fourFold,group=None,positions=None):
+		# Every polarization of a block of columns, the allele codes are only gathered and counted once
+		pol = block[:-self.outgroups]
+		if(group is None):
+			group = np.zeros(fourFold.shape[0],dtype=np.intp)
+		alleles,counts = alleleCounts(pol,block[pol.shape[0]:])
+		called = pol.shape[0] - counts[baseCodes[ord('N')]] - counts[baseCodes[ord('-')]]
+
+		# Diversity does not depend on the outgroups
+		if(self.diversity is not None or self.windowBins is not None):
+			complete,segregating,pairwise = diversityArrays(counts,pol.shape[0])
+			if(self.diversity is not None):
+				self.diversity.addSites(pol.shape[0],fourFold,complete,segregating,pairwise,group)
+			if(self.windowBins is not None):
+				self.windowBins.addSites(pol.shape[0],fourFold,complete,segregating,pairwise,positions // self.windowStep)
+
+		for i,outgroup in enumerate(self.polarizations):
+			ancestral = consensusAllele(block[pol.shape[0]:]) if(outgroup is None) else block[pol.shape[0] + outgroup]
+			keep,derived,div = sfsArrays(pol,ancestral,self.projection is not None,(alleles,counts.copy()))
+			shifted = np.where(group >= 0,group + i * self.nGenes,-1)
+			if(self.projection is None):
+				self.addSites(fourFold,derived,div,keep & ~div,shifted)
+			else:
+				self.addProjected(fourFold,called,derived,div,keep,shifted)
+
+	def add(self,sequenceMatrix,groupOf=None,begin=0):
+		# Accumulate every 0/4-fold column of an AlignmentMatrix. groupOf maps column indexes to gene indexes, begin is the first alignment column
+		nIngroup = sequenceMatrix.codes.shape[0] - self.outgroups
+		if(nIngroup < 2):
+			print('numberOfLines')
+			sys.exit('numberOfLines')
+		if(self.projection is not None and self.projection > nIngroup):
+			print('projectionSize')
+			sys.exit('projectionSize')
+		self.setSamples(nIngroup if(self.projection is None) else self.projection)
+		self.length = max(self.length,begin + sequenceMatrix.codes.shape[1])
+		for columns,block in sequenceMatrix.blocks():
+			group = None if(groupOf is None) else groupOf(columns)
+			self.addBlock(block,sequenceMatrix.degen[columns] == 4,group,columns + begin)
+
+	def select(self,polarization):
+		# Counts of one outgroup (or of the consensus) only
+		sfs = SfsAccumulator(self.nGenes,self.nSamples,projection=self.projection)
+		rows = slice(polarization * self.nGenes,(polarization + 1) * self.nGenes)
+		for name in ['unfoldedPi','unfoldedP0','segregating'] + divColumns:
+			setattr(sfs,name,getattr(self,name)[rows])
+		return(sfs)
+
+	def merge(self,other):
+		if(other.nSamples is not None):
+			self.setSamples(other.nSamples)
+		for name in ['unfoldedPi','unfoldedP0','segregating'] + divColumns:
+			setattr(self,name,getattr(self,name) + getattr(other,name))
+		for name in ['diversity','windowBins']:
+			if(getattr(self,name) is not None and getattr(other,name) is not None):
+				getattr(self,name).merge(getattr(other,name))
+		self.length = max(self.length,other.length)
+		return(self)
+
+	def binned(self,edges=dafBins):
+		# Sum of the spectrum over the DAF bin of each derived allele count
+		onehot = np.zeros([self.unfoldedPi.shape[1],edges.shape[0] - 1],dtype=np.int64)
+		if(self.nSamples is not None):
+			bins = dafBin(np.arange(self.nSamples + 1) / float(self.nSamples),edges)
+			onehot[np.flatnonzero(bins >= 0),bins[bins >= 0]] = 1
+
+		return(self.unfoldedPi.dot(onehot),self.unfoldedP0.dot(onehot))
+
+	def siteCategories(self,edges=dafBins):
+		# Every 0/4-fold site falls in exactly one category: 0-fold and 4-fold polymorphism per DAF bin, polymorphism
+		# outside the bins, divergence and the remaining sites of each class. Genes x categories, see categoryTables
+		Pi,P0 = self.binned(edges)
+		outsidePi = self.unfoldedPi.sum(axis=1) - Pi.sum(axis=1)
+		outsideP0 = self.unfoldedP0.sum(axis=1) - P0.sum(axis=1)
+		otherI = self.mi - self.unfoldedPi.sum(axis=1) - self.Di
+		other0 = self.m0 - self.unfoldedP0.sum(axis=1) - self.D0
+
+		return(np.column_stack([Pi,P0,outsidePi,outsideP0,self.Di,self.D0,otherI,other0]))
+
+	def dafRows(self,genes=None,edges=dafBins):
+		# iMKT column order: daf, Pi, P0. Bins are labelled by their left edge
+		Pi,P0 = self.binned(edges)
+		for i in range(Pi.shape[0]):
+			key = [] if(genes is None) else [genes[i]]
+			for label,pi,p0 in zip(edges[:-1].tolist(),Pi[i].tolist(),P0[i].tolist()):
+				yield(key + [round(label,6),pi,p0])
+
+	def divRows(self,genes=None):
+		# iMKT column order: mi, D0, m0, Di
+		for i in range(self.mi.shape[0]):
+			key = [] if(genes is None) else [genes[i]]
+			yield(key + [self.mi[i],self.D0[i],self.m0[i],self.Di[i]])
+
+	def spectrumRows(self,genes=None):
+		# Unfolded SFS: segregating sites per derived allele count, 1 to nSamples - 1
+		for i in range(self.mi.shape[0]):
+			key = [] if(genes is None) else [genes[i]]
+			for derived in range(1,(self.nSamples or 0)):
+				yield(key + [self.nSamples,derived,self.unfoldedPi[i,derived],self.unfoldedP0[i,derived]])
+
+	def write(self,dafFile,divFile,genes=None,mode='w',edges=dafBins):
+		key = [] if(genes is None) else ['gene']
+		return(writeTable(dafFile,key + dafColumns,self.dafRows(genes,edges),mode) + writeTable(divFile,key + divColumns,self.divRows(genes),mode))
+def categoryTables(categories,nBins):
+
+	# Pi, P0, mi, D0, m0, Di back from site categories (last axis), whatever the leading axes
+	Pi,P0 = categories[...,:nBins],categories[...,nBins:2 * nBins]
+	Di,D0 = categories[...,2 * nBins + 2],categories[...,2 * nBins + 3]
+	mi = Pi.sum(axis=-1) + categories[...,2 * nBins] + Di + categories[...,2 * nBins + 4]
+	m0 = P0.sum(axis=-1) + categories[...,2 * nBins + 1] + D0 + categories[...,2 * nBins + 5]
+	# Projected categories are expected counts, but site counts are whole numbers
+	if(categories.dtype.kind == 'f'):
+		mi,m0 = np.rint(mi),np.rint(m0)
+
+	return(Pi,P0,mi,D0,m0,Di)
+def writeResampled(dafFile,divFile,tables,labels,labelName,genes=None,edges=dafBins):
+
+	# One daf and div table per replicate (or quantile), stacked with a leading replicate (or quantile) column.
+	# tables are Pi, P0, mi, D0, m0, Di with replicates x genes leading axes
+	Pi,P0,mi,D0,m0,Di = tables
+	nReplicates,nGenes = mi.shape
+	key = [labelName] + ([] if(genes is None) else ['gene'])
+	def rowKey(r,g):
+		return([labels[r]] + ([] if(genes is None) else [genes[g]]))
+	dafRows = (rowKey(r,g) + [round(label,6),pi,p0] for r in range(nReplicates) for g in range(nGenes) for label,pi,p0 in zip(edges[:-1].tolist(),Pi[r,g].tolist(),P0[r,g].tolist()))
+	divRows = (rowKey(r,g) + [mi[r,g],D0[r,g],m0[r,g],Di[r,g]] for r in range(nReplicates) for g in range(nGenes))
+
+	return(writeTable(dafFile,key + dafColumns,dafRows) + writeTable(divFile,key + divColumns,divRows))
+def resampleSfs(accumulators,genes,mode,dafFile,divFile,replicates=1000,edges=dafBins,seed=1,workers=1,probabilities=None,profile=noProfile):
+
+	# Site categories are computed once, replicates are weighted sums of them
+	with profile.stage('resample'):
+		categories = np.vstack([sfs.siteCategories(edges) for sfs in accumulators])
+		draws = resample(categories,mode,replicates,seed,workers)
+	profile.count('resample','replicates',draws.shape[0])
+
+	# Jackknife replicates are named after the gene left out. Gene bootstraps and jackknives describe all genes pooled
+	labels,labelName = list(range(draws.shape[0])),'replicate'
+	if(mode == 'jackknife'):
+		labels,labelName = list(genes),'leftOut'
+	# Quantiles of every table column over the replicates, after mi and m0 are summed up replicate by replicate
+	tables = categoryTables(draws,edges.shape[0] - 1)
+	if(probabilities is not None):
+		tables = [quantiles(table,probabilities) for table in tables]
+		labels,labelName = probabilities,'quantile'
+
+	with profile.stage('write'):
+		written = writeResampled(dafFile,divFile,tables,labels,labelName,genes if(mode == 'sites') else None,edges)
+	profile.count('write','records',written)
+
+	return(written)
+def mkSummary(path,accumulators,genes,edges=dafBins,cutoff=0.15,profile=noProfile):
+
+	# Standard MK, Fisher's exact test, FWW and asymptotic alpha per gene, straight from the accumulators
+	with profile.stage('mk'):
+		rows = list()
+		for sfs in accumulators:
+			Pi,P0 = sfs.binned(edges)
+			for i in range(Pi.shape[0]):
+				rows.append([genes[len(rows)]] + mkRow(edges[:-1],Pi[i],P0[i],sfs.mi[i],sfs.D0[i],sfs.m0[i],sfs.Di[i],cutoff))
+	profile.count('mk','genes',len(rows))
+
+	with profile.stage('write'):
+		if(path.endswith('.parquet')):
+			# Parquet needs pandas and pyarrow, which are not required otherwise
+			try:
+				import pandas as pd
+				pd.DataFrame(rows,columns=['gene'] + mkColumns).to_parquet(path,index=False)
+			except ImportError as error:
+				sys.exit('Parquet output needs pandas and pyarrow: ' + str(error))
+		else:
+			writeTable(path,['gene'] + mkColumns,rows)
+	profile.count('write','records',len(rows))
+
+	return(len(rows))
+def writeSfs(keyed,dafFile,divFile,spectrumFile=None,edges=dafBins,mode='w'):
+
+	# keyed holds (gene IDs of every group or None, SfsAccumulator) pairs, written one after the other to combined tables
+	key = ['gene'] if(any([genes is not None for genes,sfs in keyed])) else []
+	written = 0
+	if(dafFile is not None):
+		written += writeTable(dafFile,key + dafColumns,(row for genes,sfs in keyed for row in sfs.dafRows(genes,edges)),mode)
+		written += writeTable(divFile,key + divColumns,(row for genes,sfs in keyed for row in sfs.divRows(genes)),mode)
+	if(spectrumFile is not None):
+		written += writeTable(spectrumFile,key + spectrumColumns,(row for genes,sfs in keyed for row in sfs.spectrumRows(genes)))
+
+	return(written)
+def outgroupPath(path,polarization,nPolarizations):
+
+	# With one SFS per outgroup, every output name gets .outgroup1, .outgroup2, ... before its extension
+	if(path is None or nPolarizations == 1):
+		return(path)
+	root,extension = os.path.splitext(path)
+
+	return(root + '.outgroup' + str(polarization + 1) + extension)
+def writeStats(keyed,statsFile=None,windowFile=None,windowSize=None,batch=False):
+
+	# Per-gene table from keyed (gene IDs of every group or None, SfsAccumulator) pairs. Windows are along each alignment,
+	# keyed by gene in batch runs, where every accumulator is one gene, however many there are
+	written = 0
+	if(statsFile is not None):
+		key = ['gene'] if(any([genes is not None for genes,sfs in keyed])) else []
+		rows = (row for genes,sfs in keyed for row in sfs.diversity.rows(None if(genes is None) else [[gene] for gene in genes]))
+		written += writeTable(statsFile,key + statsColumns,rows)
+	if(windowFile is not None):
+		key = ['gene'] if(batch) else []
+		def windowRows(genes,sfs):
+			windows,starts,ends = sfs.windowBins.windows(windowSize,sfs.windowStep,sfs.length)
+			prefix = genes if(batch) else []
+			return(windows.rows([prefix + [start,end] for start,end in zip(starts.tolist(),ends.tolist())]))
+		written += writeTable(windowFile,key + ['start','end'] + statsColumns,(row for genes,sfs in keyed for row in windowRows(genes,sfs)))
+
+	return(written)
+def writeTable(path,header,rows,mode='w'):
+
+	# Returns the number of rows written
+	output = open(path,mode)
+	output.write('\t'.join(header) + '\n')
+	written = 0
+	for row in rows:
+		output.write('\t'.join([str(value) for value in row]) + '\n')
+		written += 1
+	output.close()
+
+	return(written)
 def formatSfs(sequenceMatrix,rawSfsOutput,dafFile,divFile,path,append=True):
 
-	df = pd.DataFrame(rawSfsOutput)
-	df['id'] = 'uploaded'
-	df.columns = ['derivedAlleleFrequency','d','functionalClass','id']
+	# Same binning and layout as SfsAccumulator, from [AF, div, functionalClass] records
+	sfs = SfsAccumulator(nSamples=sequenceMatrix.codes.shape[0] - 1)
+	if(len(rawSfsOutput) > 0):
+		AF,div,functionalClass = [np.array(values) for values in zip(*rawSfsOutput)]
+		# Records carry frequencies, the spectrum needs counts
+		derived = np.rint(AF.astype(np.float64) * sfs.nSamples).astype(np.intp)
+		sfs.addSites(functionalClass == '4fold',derived,div == 1,div != 1)
+
+	# Records only cover retained sites, site counts come from the matrix
+	sfs.mi[0],sfs.m0[0] = sequenceMatrix.siteCounts()
+
+	sfs.write(path + dafFile,path + divFile,mode='a' if(append is True) else 'w')
+def profiledChunks(chunks,profile):
+
+	# Time spent reading and encoding each chunk goes to the matrix stage
+	while True:
+		with profile.stage('matrix'):
+			begin,chunk = next(chunks,(None,None))
+		if(chunk is None):
+			return
+		if(begin == 0):
+			profile.count('matrix','samples',chunk.codes.shape[0])
+		profile.count('matrix','sites',chunk.codes.shape[1])
+		profile.count('matrix','selectedSites',chunk.sites.shape[0])
+		yield(begin,chunk)
+def sfsFromFile(multiFasta,codonTable,window=None,profile=noProfile,cache=None,options=None,reader='pyfaidx'):
+
+	# With a window, peak memory depends on the window and not on the alignment length. Partial counts are merged as they come.
+	# options are SfsAccumulator settings: outgroups, ancestral and projection
+	sfs = SfsAccumulator(**(options or {}))
+	for begin,chunk in fileChunks(multiFasta,codonTable,window,profile,cache,reader):
+		with profile.stage('sfs'):
+			sfs.add(chunk,begin=begin)
+	profile.count('sfs','segregatingSites',sfs.segregating.sum())
+
+	return(sfs)
+def readPositions(startCoordinates):
+
+	# Positions table written by subsetMultiFasta.py: transcript, strand, startCds, seqPos, length
+	rows = [line.rstrip('\n').split('\t') for line in open(startCoordinates)]
+	header = rows[0]
+	rows = [row for row in rows[1:] if(row != [''])]
+	transcripts = [row[header.index('transcript')] for row in rows]
+	starts = np.array([int(row[header.index('startCds')]) for row in rows],dtype=np.int64)
+	lengths = np.array([int(row[header.index('length')]) for row in rows],dtype=np.int64)
+
+	return(transcripts,starts,lengths)
+def cdsSfsFromFile(multiFasta,codonTable,startCoordinates,window=None,profile=noProfile,cache=None,options=None,reader='pyfaidx'):
+
+	with profile.stage('index'):
+		transcripts,starts,lengths = readPositions(startCoordinates)
 
-	# Extract divergence data
-	div = df[['id','functionalClass','d']]
-	div = div[div['d']!=0]
-	div = div.groupby(['id','functionalClass'])['d'].count().reset_index()
-	div = div.pivot_table(index=['id'],columns=['functionalClass'],values='d').reset_index()
+	# Columns are looked up in transcripts sorted by start, groups stay in the order of the Positions file
+	order = np.argsort(starts,kind='mergesort')
+	sortedStarts,sortedEnds = starts[order],(starts + lengths)[order]
+	if((sortedStarts[1:] < sortedEnds[:-1]).any()):
+		print('positionsOverlap')
+		sys.exit('positionsOverlap')
+
+	# Per-transcript counts, filled by grouped reductions over the transcript index of each column
+	sfs = SfsAccumulator(len(transcripts),**(options or {}))
+	for begin,chunk in fileChunks(multiFasta,codonTable,window,profile,cache,reader):
+		def groupOf(columns,begin=begin):
+			index = np.searchsorted(sortedStarts,columns + begin,side='right') - 1
+			outside = (index < 0) | (columns + begin >= sortedEnds[np.maximum(index,0)])
+			return(np.where(outside,-1,order[np.maximum(index,0)]))
+		with profile.stage('sfs'):
+			sfs.add(chunk,groupOf,begin)
+	profile.count('sfs','transcripts',len(transcripts))
+	profile.count('sfs','segregatingSites',sfs.segregating.sum())
+
+	return(transcripts,sfs)
+def readSpectrum(spectrumFile):
+
+	# Spectrum table written by --spectrum, with a leading gene column in batch and per-transcript runs
+	rows = [line.rstrip('\n').split('\t') for line in open(spectrumFile)]
+	keyed = rows[0][0] == 'gene'
+	# Projected spectra hold expected, fractional counts
+	projected = any(['.' in value for row in rows[1:] for value in row[-2:]])
+	genes = list()
+	accumulators = list()
+	for row in rows[1:]:
+		if(row == ['']):
+			continue
+		gene = row[0] if(keyed) else None
+		nSamples,derived = int(row[-4]),int(row[-3])
+		Pi,P0 = float(row[-2]),float(row[-1])
+		if(len(accumulators) == 0 or gene != genes[-1]):
+			genes.append(gene)
+			accumulators.append(SfsAccumulator(nSamples=nSamples,projection=nSamples if(projected) else None))
+		accumulators[-1].unfoldedPi[0,derived] += Pi
+		accumulators[-1].unfoldedP0[0,derived] += P0
+
+	return(genes if(keyed) else None,accumulators)
+def rebinSpectrum(spectrumFile,dafFile,edges=dafBins):
+
+	# Binned DAF from a saved spectrum, the alignments are not read again
+	genes,accumulators = readSpectrum(spectrumFile)
+	key = [] if(genes is None) else ['gene']
+	rows = (row for i,sfs in enumerate(accumulators) for row in sfs.dafRows(None if(genes is None) else [genes[i]],edges))
+
+	return(writeTable(dafFile,key + dafColumns,rows))
+def batchAlignments(batch):
+
+	# Directory of alignments or manifest with one path (optionally gene ID<TAB>path) per line
+	if(os.path.isdir(batch)):
+		paths = sorted([os.path.join(batch,f) for f in os.listdir(batch) if(os.path.splitext(f)[1] in batchExtensions)])
+		return([(os.path.splitext(os.path.basename(path))[0],path) for path in paths])
+
+	alignments = list()
+	manifestDir = os.path.dirname(batch)
+	for line in open(batch):
+		fields = line.strip().split('\t')
+		if(fields[0] == '' or fields[0].startswith('#')):
+			continue
+		path = os.path.join(manifestDir,fields[-1])
+		gene = fields[0] if(len(fields) > 1) else os.path.splitext(os.path.basename(path))[0]
+		alignments.append((gene,path))
+
+	return(alignments)
+def batchWorker(task):
+
+	# Runs in the pool: a failing gene is reported back instead of stopping the batch. Stages are profiled per gene and sent back with it
+	gene,multiFasta,codonTable,window,cache,options,reader,profiled = task
+	profile = StageProfile(enabled=profiled)
 	try:
-		div = div[['0fold','4fold']]
-	except:
-		if('4fold' in div.columns):
-			div = div[['4fold']]
-			div['0fold'] = 0
-		elif('0fold' in div.columns):
-			div = div[['0fold']]
-			div['4fold'] = 0
-
-	div['mi'] =  sequenceMatrix[0][np.where(sequenceMatrix[0]=='0')].shape[0]
-	div['m0'] =  sequenceMatrix[0][np.where(sequenceMatrix[0]=='4')].shape[0]
-	div = div.rename(columns={'0fold':'Di','4fold':'D0','mi':'mi','m0':'m0'})
-	# div = div.pivot_table(index=['functionalClass'],columns=['functionalClass'],values='div').reset_index()
-
-	# Create SFS pd.DataFrame by functionClass and 20 frequency bin
-	daf = df[df['d']!=1][['derivedAlleleFrequency','functionalClass','id']]
-	bins = np.arange(0.025,1.05,0.05)
-	labels = np.arange(0.025,1.0,0.05).tolist()
-	daf['categories'] = pd.cut(daf['derivedAlleleFrequency'],bins=bins,labels=labels)
-	daf = daf.groupby(['functionalClass','id','categories']).count().reset_index()
-	sfs = pd.DataFrame({'daf':daf['categories'].unique(),'P0':daf[daf['functionalClass']=='4fold']['derivedAlleleFrequency'].reset_index(drop=True),'Pi':daf[daf['functionalClass']=='0fold']['derivedAlleleFrequency'].reset_index(drop=True)})
-
-	sfs = sfs[['daf','P0','Pi']]
-	sfs['P0'] = sfs['P0'].fillna(0)
-	sfs['Pi'] = sfs['Pi'].fillna(0)
-	sfs['daf'] = sfs['daf'].apply(lambda x: round(x,3))
-
-	if(append is True):
-		sfs.to_csv(path + dafFile,sep='\t',header=True,index=False,mode='a')
-		div.to_csv(path + divFile,sep='\t',header=True,index=False,mode='a')
+		cache = AlignmentCache(*cache) if(cache is not None) else None
+		return(gene,sfsFromFile(multiFasta,codonTable,window,profile,cache,options,reader),None,profile.stages)
+	except (SystemExit,Exception) as error:
+		return(gene,None,str(error),profile.stages)
+def sfsBatch(alignments,codonTable,workers=1,window=None,profile=noProfile,cache=None,options=None,reader='pyfaidx'):
+
+	# Workers open the cache themselves, only its directory and cap are sent
+	cache = (cache.directory,cache.maxBytes) if(cache is not None) else None
+	tasks = [(gene,multiFasta,codonTable,window,cache,options,reader,profile.enabled) for gene,multiFasta in alignments]
+	if(workers > 1):
+		pool = multiprocessing.Pool(workers)
+		results = pool.imap(batchWorker,tasks,chunksize=max(1,len(tasks) // (workers * 16)))
 	else:
-		sfs.to_csv(path + dafFile,sep='\t',header=True,index=False)
-		div.to_csv(path + divFile,sep='\t',header=True,index=False)
+		pool = None
+		results = map(batchWorker,tasks)
+
+	# Results come back in manifest order, whatever worker finished first
+	genes = list()
+	accumulators = list()
+	with profile.stage('batch'):
+		for gene,sfs,error,stages in results:
+			profile.merge(stages)
+			if(error is not None):
+				sys.stderr.write(gene + '\t' + error + '\n')
+			else:
+				genes.append(gene)
+				accumulators.append(sfs)
+
+		if(pool is not None):
+			pool.close()
+			pool.join()
+	profile.count('batch','genes',len(genes))
+	profile.count('batch','failedGenes',len(tasks) - len(genes))
+	profile.count('batch','segregatingSites',sum([sfs.segregating.sum() for sfs in accumulators]))
+
+	return(genes,accumulators)
 
 #################BGD GROUP######################
 ########UNIVERSITAT AUTONOMA DE BARCELONA#######
@@ -312,34 +901,126 @@ if __name__ == '__main__':
 	'''Parse arguments and show the required inputs if only name is given to command line'''
 	parser = argparse.ArgumentParser(description='Estimate binned DAF and diverngece from multiFASTA alignments. The expected input is the same as described in https://doi.org/10.1093/nar/gkz372')
 	# Required arguments
-	parser.add_argument('--multiFasta', type = str, required = True, help = 'Raw data to estimate SFS and divergence, including reference and outgroup.')
-	parser.add_argument('--daf', type = str, required = True, help = 'Name to DAF file')
-	parser.add_argument('--div', type = str, required = True, help = 'Name to divergence file')
-	parser.add_argument('--codonTable', type = str, required = True, choices=['standard','VertebrateMitochondrial','YeastMitochondrial','MoldMitochondrialProtozoanMitochondrialCoelenterateMitochondrialMycoplasmaSpiroplasma','InvertebrateMitochondrial','CiliateNuclearDasycladaceanNuclearHexamitaNuclear','EchinodermMitochondrialFlatwormMitochondrial','EuplotidNuclear','BacterialArchaealandPlantPlastid','AlternativeYeastNuclear','AlternativeFlatwormMitochondrial','BlepharismaMacronuclear','ChlorophyceanMitochondrial','TrematodeMitochondrial','ScenedesmusobliquusMitochondrial','ThraustochytriumMitochondrial','PterobranchiaMitochondrial','CandidateDivisionSR1andGracilibacteria','PachysolentannophilusNuclear','KaryorelictNuclear','CondylostomaNuclear','MesodiniumNuclear','PeritrichNuclear','BlastocrithidiaNuclear','BalanophoraceaePlastid'],help = 'Codon degeneracy to use')
-	parser.add_argument('--startCoordinates', type = str, required = False, help = 'List of coordinates if CDS are merge in one large CDS')
+	parser.add_argument('--multiFasta', type = str, required = False, help = 'Raw data to estimate SFS and divergence, including reference and outgroup.')
+	parser.add_argument('--daf', type = str, required = False, help = 'Name to DAF file')
+	parser.add_argument('--div', type = str, required = False, help = 'Name to divergence file')
+	parser.add_argument('--codonTable', type = str, required = False, choices=codonTableNames,help = 'Codon degeneracy to use')
+	parser.add_argument('--startCoordinates', type = str, required = False, help = 'Positions file from subsetMultiFasta.py if CDS are merge in one large CDS. DAF and divergence are reported per transcript')
+	parser.add_argument('--batch', type = str, required = False, help = 'Directory of multi-FASTA alignments or manifest listing them. DAF and divergence of every gene are written to one combined table each')
+	parser.add_argument('--workers', type = int, required = False, default = 1, help = 'Number of processes used by --batch')
+	parser.add_argument('--window', type = int, required = False, help = 'Stream the alignment in windows of this many columns (rounded down to whole codons) instead of loading it at once')
+	parser.add_argument('--reader', type = str, required = False, default = 'pyfaidx', choices = readers, help = 'FASTA backend: pyfaidx, or mmap to read memory-mapped bytes through a built-in offsets index (fixed line width per record)')
+	parser.add_argument('--profile', type = str, required = False, help = 'Write wall time, CPU time, peak memory and item counts per stage to this JSON file')
+	parser.add_argument('--cache', type = str, required = False, help = 'Directory where encoded alignments and degeneracy are kept between runs, keyed by FASTA content and codon table')
+	parser.add_argument('--cacheSize', type = float, required = False, default = 4096, help = 'Cache size cap in MB, least recently used alignments are removed first')
+	parser.add_argument('--bins', type = int, required = False, help = 'Number of equal DAF bins, centred on multiples of 1/N. Defaults to the 20 bins iMKT expects')
+	parser.add_argument('--binEdges', type = str, required = False, help = 'Comma-separated DAF bin edges, bins are (left,right] and labelled by their left edge. Overrides --bins')
+	parser.add_argument('--spectrum', type = str, required = False, help = 'Also write the exact unfolded SFS (sites per derived allele count and functional class) to this file')
+	parser.add_argument('--resample', type = str, required = False, choices = resamplingModes, help = 'Bootstrap sites within each gene, bootstrap genes, or leave one gene out. Replicates are written to --resampleDaf and --resampleDiv')
+	parser.add_argument('--resampleDaf', type = str, required = False, help = 'Name to replicate DAF file')
+	parser.add_argument('--resampleDiv', type = str, required = False, help = 'Name to replicate divergence file')
+	parser.add_argument('--replicates', type = int, required = False, default = 1000, help = 'Number of bootstrap replicates')
+	parser.add_argument('--seed', type = int, required = False, default = 1, help = 'Seed of the bootstrap replicates')
+	parser.add_argument('--quantiles', type = str, required = False, help = 'Comma-separated probabilities, e.g. 0.025,0.5,0.975. Writes these quantiles of the replicates instead of every replicate')
+	parser.add_argument('--mk', type = str, required = False, help = 'Write standard MK, Fisher exact p-value, FWW and asymptotic alpha per gene to this TSV (or .parquet) file. Asymptotic alpha is NaN with fewer than 3 DAF bins with 4-fold polymorphism. --daf and --div can then be left out')
+	parser.add_argument('--fwwCutoff', type = float, required = False, default = 0.15, help = 'DAF cutoff of the FWW alpha, bins labelled at or below it are left out')
+	parser.add_argument('--outgroups', type = int, required = False, default = 1, help = 'Number of outgroup sequences at the end of each alignment')
+	parser.add_argument('--ancestral', type = str, required = False, default = 'consensus', choices = ['consensus','each'], help = 'Polarize with the allele shared by all outgroups, or write one SFS per outgroup (.outgroup1, .outgroup2, ... output names)')
+	parser.add_argument('--projection', type = int, required = False, help = 'Down-project every site with at least this many called ingroup samples to this sample size, so sites with missing data are kept')
+	parser.add_argument('--stats', type = str, required = False, help = 'Write pi, Watterson theta (per site), Tajima D and segregating sites of 0-fold and 4-fold sites per gene to this file')
+	parser.add_argument('--windowStats', type = str, required = False, help = 'Write the same statistics per sliding window along the alignment to this file, windows are 0-based [start,end) columns')
+	parser.add_argument('--statsWindow', type = int, required = False, default = 10000, help = 'Size of the --windowStats windows in alignment columns')
+	parser.add_argument('--statsStep', type = int, required = False, help = 'Step between --windowStats windows, defaults to the window size. The window size must be a multiple of it')
+	parser.add_argument('--rebin', type = str, required = False, help = 'Spectrum file from --spectrum to rebin into --daf, no alignment is read')
 
 	args = parser.parse_args()
 	start = time.time()
 	pwd = os.getcwd() + '/'
 
-	# Open multi-Fasta
-	file = px.Fasta(args.multiFasta,duplicate_action='first',sequence_always_upper=True,read_long_names=True)
+	try:
+		edges = dafEdges(args.bins,None if(args.binEdges is None) else [float(edge) for edge in args.binEdges.split(',')])
+	except ValueError as error:
+		parser.error(str(error))
 
-	# Create ndarray with sequences
-	multiFastaMatrix = sequencesToMatrix(file)
+	if(args.rebin is not None):
+		if(args.daf is None):
+			parser.error('--rebin needs --daf')
+		rebinSpectrum(args.rebin,args.daf,edges)
+		sys.exit(0)
+	if(args.batch is None and args.multiFasta is None):
+		parser.error('--multiFasta or --batch is required')
+	if(args.codonTable is None):
+		parser.error('--codonTable is required')
+	if((args.daf is None) != (args.div is None)):
+		parser.error('--daf and --div go together')
+	if(args.daf is None and args.mk is None):
+		parser.error('--daf and --div are required unless --mk is given')
+	if(args.resample is not None and (args.resampleDaf is None or args.resampleDiv is None)):
+		parser.error('--resample needs --resampleDaf and --resampleDiv')
+	if(args.resample in ['genes','jackknife'] and args.batch is None and args.startCoordinates is None):
+		parser.error('--resample ' + args.resample + ' needs several genes (--batch or --startCoordinates)')
+	if(args.outgroups < 1):
+		parser.error('--outgroups must be at least 1')
+	if(args.projection is not None and args.projection < 2):
+		parser.error('--projection must be at least 2 samples')
+	if(args.replicates < 1):
+		parser.error('--replicates must be at least 1')
+	try:
+		probabilities = None if(args.quantiles is None) else [float(p) for p in args.quantiles.split(',')]
+	except ValueError:
+		parser.error('--quantiles must be comma-separated numbers')
+	if(probabilities is not None and not all([0 <= p <= 1 for p in probabilities])):
+		parser.error('--quantiles must be within [0,1]')
+	if(args.statsWindow <= 0 or (args.statsStep is not None and args.statsStep <= 0)):
+		parser.error('--statsWindow and --statsStep must be positive')
+	if(args.statsStep is not None and args.statsWindow % args.statsStep != 0):
+		parser.error('--statsWindow must be a multiple of --statsStep')
 
-	# Check if there is more than 2 individuals to extract polymorphism
-	if(multiFastaMatrix.shape[0] < 4):
-		print('numberOfLines')
-		sys.exit('numberOfLines')
+	profile = StageProfile(enabled=args.profile is not None,start=start)
+	cache = AlignmentCache(args.cache,int(args.cacheSize * 1024 ** 2)) if(args.cache is not None) else None
 
-	# Estimating SFS
-	rawSfs = uSfsFromFasta(multiFastaMatrix)
+	statsStep = (args.statsWindow if(args.statsStep is None) else args.statsStep) if(args.windowStats is not None) else None
+	options = {'outgroups':args.outgroups,'ancestral':args.ancestral,'projection':args.projection,'statistics':args.stats is not None,'windowStep':statsStep}
+	dafFile,divFile = args.daf,args.div
+	if(args.batch is not None):
+		# One process pool over every alignment, combined tables keyed by gene ID
+		genes,accumulators = sfsBatch(batchAlignments(args.batch),args.codonTable,args.workers,args.window,profile,cache,options,args.reader)
+		keyed,mode = [([gene],sfs) for gene,sfs in zip(genes,accumulators)],'w'
+	elif(args.startCoordinates is not None):
+		# Every transcript of a merged CDS alignment in one pass, one divergence row per transcript
+		genes,sfs = cdsSfsFromFile(args.multiFasta,args.codonTable,args.startCoordinates,args.window,profile,cache,options,args.reader)
+		accumulators = [sfs]
+		keyed,mode = [(genes,sfs)],'w'
+	else:
+		sfs = sfsFromFile(args.multiFasta,args.codonTable,args.window,profile,cache,options,args.reader)
+		genes,accumulators = None,[sfs]
+		keyed,mode = [(None,sfs)],'a'
+		# Single alignments are appended to the DAF and divergence files of the working directory
+		if(dafFile is not None):
+			dafFile,divFile = pwd + dafFile,pwd + divFile
 
-	# Formating SFS
-	formatSfs(multiFastaMatrix,rawSfs,args.daf,args.div,pwd)
+	# Diversity statistics do not depend on the outgroups, they are written once
+	if(args.stats is not None or args.windowStats is not None):
+		with profile.stage('write'):
+			profile.count('write','records',writeStats(keyed,args.stats,args.windowStats,args.statsWindow,args.batch is not None))
 
+	# One set of outputs for the outgroup consensus or for each outgroup
+	nPolarizations = 1 if(args.ancestral == 'consensus') else args.outgroups
+	for polarization in range(nPolarizations):
+		def output(path):
+			return(outgroupPath(path,polarization,nPolarizations))
+		selected = [sfs.select(polarization) for sfs in accumulators]
 
+		# Formating SFS
+		with profile.stage('write'):
+			profile.count('write','records',writeSfs([(keys,sfs) for (keys,_),sfs in zip(keyed,selected)],output(dafFile),output(divFile),output(args.spectrum),edges,mode))
 
+		# MK results in memory, without reading the daf and div tables back
+		if(args.mk is not None):
+			mkSummary(output(args.mk),selected,genes or [os.path.splitext(os.path.basename(args.multiFasta))[0]],edges,args.fwwCutoff,profile)
 
+		# Confidence intervals from weighted sums of per-site or per-gene counts, the alignments are not read again
+		if(args.resample is not None):
+			resampleSfs(selected,genes,args.resample,output(args.resampleDaf),output(args.resampleDiv),args.replicates,edges,args.seed,args.workers,probabilities,profile)
 
+	profile.write(args.profile,script='sfsFromFasta_v2.py',arguments=vars(args))
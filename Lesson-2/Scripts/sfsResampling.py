@@ -0,0 +1,55 @@
+import multiprocessing
+import numpy as np
+
+# Replicates drawn per task. Each block has its own seed, so results do not depend on the number of workers
+replicateBlock = 100
+resamplingModes = ['sites','genes','jackknife']
+def bootstrapSites(categories,replicates,rng):
+
+	# Sites of every gene drawn with replacement. A site only matters through its category, so a multinomial draw over category counts is enough.
+	# Projected counts are expected values, only their total is rounded
+	draws = np.zeros([replicates] + list(categories.shape),dtype=np.int64)
+	for gene,counts in enumerate(categories):
+		total = counts.sum()
+		if(total > 0):
+			draws[:,gene] = rng.multinomial(int(round(total)),counts / float(total),size=replicates)
+
+	return(draws)
+def bootstrapGenes(categories,replicates,rng):
+
+	# Genes drawn with replacement, every replicate is a weighted sum of per-gene counts
+	nGenes = categories.shape[0]
+	weights = rng.multinomial(nGenes,np.ones(nGenes) / nGenes,size=replicates)
+
+	return(weights.dot(categories)[:,np.newaxis,:])
+def jackknifeGenes(categories):
+
+	# One replicate per gene, leaving that gene out
+	return((categories.sum(axis=0) - categories)[:,np.newaxis,:])
+def replicateTask(task):
+	mode,categories,replicates,seed = task
+	rng = np.random.RandomState(seed)
+	if(mode == 'sites'):
+		return(bootstrapSites(categories,replicates,rng))
+
+	return(bootstrapGenes(categories,replicates,rng))
+def resample(categories,mode,replicates=1000,seed=1,workers=1):
+
+	# Replicates x genes x categories. Gene bootstraps and jackknives pool every gene into one row
+	if(mode == 'jackknife'):
+		return(jackknifeGenes(categories))
+
+	tasks = [(mode,categories,min(replicateBlock,replicates - i),[seed,i]) for i in range(0,replicates,replicateBlock)]
+	if(workers > 1 and len(tasks) > 1):
+		pool = multiprocessing.Pool(workers)
+		draws = pool.map(replicateTask,tasks)
+		pool.close()
+		pool.join()
+	else:
+		draws = [replicateTask(task) for task in tasks]
+
+	return(np.concatenate(draws,axis=0))
+def quantiles(draws,probabilities):
+
+	# Quantiles x genes x categories, over replicates
+	return(np.percentile(draws,[100 * p for p in probabilities],axis=0))
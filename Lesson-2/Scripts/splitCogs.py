@@ -0,0 +1,83 @@
+import os
+import mmap
+import argparse
+from collections import defaultdict
+
+def indexRecords(path):
+
+	# Header fields and byte range of the sequence of every record, in one pass over the file
+	records = list()
+	handle = open(path,'rb')
+	offset = 0
+	header = None
+	for line in handle:
+		if(line.startswith(b'>')):
+			if(header is not None):
+				records.append((header,start,offset))
+			header = line[1:].decode('ascii').split()
+			start = offset + len(line)
+		offset += len(line)
+	if(header is not None):
+		records.append((header,start,offset))
+	handle.close()
+
+	return(records)
+def groupByCog(records,outgroup,copies=None):
+
+	# synCogId|<COG>|taxonId|<taxon>|... hash index of ingroup and outgroup records per COG
+	ingroup = defaultdict(list)
+	outgroups = defaultdict(list)
+	taxa = set()
+	for record in records:
+		fields = record[0][0].split('|')
+		cog,taxon = fields[1],fields[3]
+		taxa.add(taxon)
+		if(taxon == outgroup):
+			outgroups[cog].append(record)
+		else:
+			ingroup[cog].append(record)
+
+	# Universal COGs have exactly one outgroup record and one record per ingroup taxon, on every taxon unless another copy number is given.
+	# A duplicated ingroup record never stands in for a missing taxon or outgroup
+	copies = copies or len(taxa)
+	def universalCog(cog):
+		ingroupTaxa = [header[0].split('|')[3] for header,start,end in ingroup[cog]]
+		return(len(outgroups[cog]) == 1 and len(set(ingroupTaxa)) == len(ingroupTaxa) and len(ingroupTaxa) + 1 == copies)
+	universal = sorted([cog for cog in set(ingroup) | set(outgroups) if(universalCog(cog))])
+
+	return(universal,ingroup,outgroups)
+def writeCogs(path,universal,ingroup,outgroups,output,width=60):
+
+	handle = open(path,'rb')
+	data = mmap.mmap(handle.fileno(),0,access=mmap.ACCESS_READ)
+
+	# Outgroup last, as sfsFromFasta_v2.py expects
+	for cog in universal:
+		f = open(os.path.join(output,'synCOG' + cog + '.fasta'),'wb')
+		for header,start,end in ingroup[cog] + outgroups[cog]:
+			seq = data[start:end].replace(b'\n',b'').replace(b'\r',b'')
+			f.write(('>' + ' '.join(header) + '\n').encode('ascii'))
+			for i in range(0,len(seq),width):
+				f.write(seq[i:i+width] + b'\n')
+		f.close()
+
+	data.close()
+	handle.close()
+
+if __name__ == '__main__':
+	'''Parse arguments and show the required inputs if only name is given to command line'''
+	parser = argparse.ArgumentParser(description='Split an ATGC cluster alignment into one multi-FASTA per universal COG, with the outgroup as last sequence.')
+	# Required arguments
+	parser.add_argument('--fasta', type = str, required = True, help = 'ATGC alignment with synCogId|<COG>|taxonId|<taxon> headers.')
+	parser.add_argument('--outgroup', type = str, required = True, help = 'Taxon ID of the outgroup.')
+	parser.add_argument('--output', type = str, required = True, help = 'Output directory.')
+	parser.add_argument('--copies', type = int, required = False, help = 'Taxa (outgroup included) a COG needs, each with one record, to be kept. Defaults to the number of taxa')
+
+	args = parser.parse_args()
+
+	records = indexRecords(args.fasta)
+	universal,ingroup,outgroups = groupByCog(records,args.outgroup,args.copies)
+
+	if(not os.path.isdir(args.output)):
+		os.makedirs(args.output)
+	writeCogs(args.fasta,universal,ingroup,outgroups,args.output)
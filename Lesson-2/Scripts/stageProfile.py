@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import resource
+from contextlib import contextmanager
+
+def peakMemory(who=resource.RUSAGE_SELF):
+	# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+	peak = resource.getrusage(who).ru_maxrss
+	return(peak / 1024.0 ** 2 if(sys.platform == 'darwin') else peak / 1024.0)
+def highWaterMark():
+	# VmHWM of this process in MB, None where /proc is not available
+	try:
+		for line in open('/proc/self/status'):
+			if(line.startswith('VmHWM:')):
+				return(int(line.split()[1]) / 1024.0)
+	except (IOError,OSError):
+		pass
+	return(None)
+def resetHighWaterMark():
+	# Writing 5 to clear_refs sets VmHWM back to the current RSS (Linux 4.0 and later)
+	try:
+		f = open('/proc/self/clear_refs','w')
+		f.write('5')
+		f.close()
+	except (IOError,OSError):
+		return(False)
+	return(highWaterMark() is not None)
+
+# Stages running in this process, whatever profile they belong to. The high-water mark is folded into all of them before every reset
+openStages = list()
+perStagePeak = resetHighWaterMark()
+def foldHighWaterMark():
+	peak = highWaterMark() if(perStagePeak) else peakMemory()
+	for stage in openStages:
+		stage['peakRssMb'] = max(stage['peakRssMb'],peak)
+class StageProfile(object):
+
+	# Wall time, CPU time, peak memory and item counts per named stage. Disabled profiles only cost a function call
+	def __init__(self,enabled=True,start=None):
+		self.enabled = enabled
+		self.start = start or time.time()
+		self.stages = list()
+
+	def record(self,name):
+		for stage in self.stages:
+			if(stage['stage'] == name):
+				return(stage)
+		stage = {'stage':name,'wallSeconds':0.0,'cpuSeconds':0.0,'peakRssMb':0.0,'childrenPeakRssMb':0.0,'counts':{}}
+		self.stages.append(stage)
+		return(stage)
+
+	@contextmanager
+	def stage(self,name):
+		# Re-entering a stage adds to its times, so interleaved loops can be profiled per stage
+		if(not self.enabled):
+			yield
+			return
+		# Peak RSS while the stage runs: the high-water mark is reset when it starts, where Linux allows it
+		stage = self.record(name)
+		if(perStagePeak):
+			foldHighWaterMark()
+			resetHighWaterMark()
+		openStages.append(stage)
+		start,cpu = time.time(),sum(os.times()[:4])
+		try:
+			yield
+		finally:
+			stage['wallSeconds'] += time.time() - start
+			stage['cpuSeconds'] += sum(os.times()[:4]) - cpu
+			foldHighWaterMark()
+			del openStages[max([i for i,other in enumerate(openStages) if(other is stage)])]
+			# Finished worker processes only have a lifetime peak
+			stage['childrenPeakRssMb'] = max(stage['childrenPeakRssMb'],peakMemory(resource.RUSAGE_CHILDREN))
+
+	def count(self,name,item,value):
+		if(self.enabled):
+			counts = self.record(name)['counts']
+			counts[item] = counts.get(item,0) + int(value)
+
+	def merge(self,stages):
+		# Stages recorded by another process (batch workers): times and counts are summed, peak memory is the largest
+		if(not self.enabled):
+			return
+		for other in stages:
+			stage = self.record(other['stage'])
+			for key in ['wallSeconds','cpuSeconds']:
+				stage[key] += other[key]
+			for key in ['peakRssMb','childrenPeakRssMb']:
+				stage[key] = max(stage[key],other[key])
+			for item,value in other['counts'].items():
+				stage['counts'][item] = stage['counts'].get(item,0) + value
+
+	def write(self,path,**info):
+		if(self.enabled):
+			info['totalSeconds'] = time.time() - self.start
+			# Without clear_refs, peakRssMb is the process peak when the stage ended
+			info['peakRssScope'] = 'stage' if(perStagePeak) else 'process'
+			info['stages'] = self.stages
+			f = open(path,'w')
+			json.dump(info,f,indent=1,sort_keys=True)
+			f.write('\n')
+			f.close()
+
+# Shared disabled profile, used when no --profile is given
+noProfile = StageProfile(enabled=False)
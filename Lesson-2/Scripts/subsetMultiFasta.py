@@ -1,19 +1,112 @@
+import os
 import sys
 import time
 import argparse
+import multiprocessing
 import numpy as np
 import pandas as pd
-import pyfaidx as px
+from stageProfile import StageProfile
+from fastaReader import readers,openFasta
+
+# Bytes buffered by the FASTA writer
+outputBuffer = 1 << 20
+
+# Complement of A/C/G/T (either case), anything else is left as it is
+complementBases = ('ACGTacgt','TGCAtgca')
+try:
+	complementTable = str.maketrans(*complementBases)
+except AttributeError:
+	import string
+	complementTable = string.maketrans(*complementBases)
+complementCodes = np.arange(256,dtype=np.uint8)
+complementCodes[np.frombuffer(complementBases[0].encode('ascii'),dtype=np.uint8)] = np.frombuffer(complementBases[1].encode('ascii'),dtype=np.uint8)
 
 def reverseComplement(seq):
 	# Sequence on dgn/sp contains M. No idea why
-	seq = seq[::-1]
-	letters = list(seq)
-	baseComplement = {'A':'T','C':'G','G':'C','T':'A','N':'N','-':'-'}
-	letters = [baseComplement[base] if base in baseComplement.keys() else base for base in letters]
-	seq = ''.join(letters)
-
-	return(seq)
+	return(seq[::-1].translate(complementTable))
+def extractionPlan(df):
+
+	# Transcripts grouped by strand (sorted, + before -) and in order of appearance within each strand
+	transcripts = list()
+	exonStarts = list()
+	exonLengths = list()
+	reverse = list()
+	for strand in sorted(df['strand'].unique()):
+		for transcript,exons in df[df['strand'] == strand].groupby('transcript',sort=False):
+			transcripts.append((transcript,strand,int((exons['end'] - exons['start'] + 1).sum())))
+			exonStarts.append(exons['start'].values - 1)
+			exonLengths.append(exons['end'].values - exons['start'].values + 1)
+			reverse.append(strand == '-')
+
+	# Exons sorted and merged into the intervals actually read, overlapping and adjacent ones joined
+	order = np.argsort(np.concatenate(exonStarts),kind='mergesort')
+	sortedStarts = np.concatenate(exonStarts)[order]
+	reach = np.maximum.accumulate(sortedStarts + np.concatenate(exonLengths)[order])
+	first = np.concatenate([[True],sortedStarts[1:] > reach[:-1]])
+	intervalStarts = sortedStarts[first]
+	intervalEnds = reach[np.append(np.flatnonzero(first)[1:] - 1,first.shape[0] - 1)]
+	intervalLengths = intervalEnds - intervalStarts
+	bufferStarts = np.cumsum(intervalLengths) - intervalLengths
+
+	# Position of every output base in the buffer of concatenated intervals, minus-strand transcripts read backwards and complemented
+	dtype = np.int32 if(intervalLengths.sum() < 2 ** 31) else np.int64
+	index = list()
+	for starts,lengths,minus in zip(exonStarts,exonLengths,reverse):
+		interval = np.searchsorted(intervalStarts,starts,side='right') - 1
+		offsets = np.cumsum(lengths) - lengths
+		positions = np.repeat(bufferStarts[interval] + starts - intervalStarts[interval] - offsets,lengths).astype(dtype) + np.arange(lengths.sum(),dtype=dtype)
+		index.append(positions[::-1] if(minus) else positions)
+	complement = np.repeat(reverse,[length for transcript,strand,length in transcripts])
+
+	return(transcripts,np.concatenate(index),complement,list(zip(intervalStarts.tolist(),intervalEnds.tolist())))
+def splicedSequence(fasta,name,plan):
+
+	# Only the merged exon intervals are read, every exon base is gathered from them and minus-strand positions complemented
+	transcripts,index,complement,intervals = plan
+	buffer = np.concatenate([fasta.bases(name,start,end,fold=True) for start,end in intervals])
+	seq = buffer[index]
+	seq[complement] = complementCodes[seq[complement]]
+
+	return(seq.tobytes())
+def writeFasta(output,name,seq):
+	output.write(('>' + name + '\n').encode('ascii'))
+	output.write(seq)
+	output.write(b'\n')
+def positionRows(plan):
+
+	# transcript, strand, startCds, seqPos, length of every transcript on the subset sequence
+	start = 0
+	for transcript,strand,length in plan[0]:
+		yield([str(transcript),strand,str(start),str(start) + '..' + str(start + length - 1),str(length)])
+		start = start + length
+def openIndexes(reference,multiFasta,outgroup,reader='pyfaidx'):
+
+	# Opened once per process and shared by every gene it extracts
+	global indexes
+	indexes = (openFasta(reference,reader),openFasta(multiFasta,reader),openFasta(outgroup,reader))
+def writeSubset(path,plan):
+
+	ref,file,out = indexes
+	refName = ref.keys()[0]
+	outName = out.keys()[0]
+
+	# Reference first and outgroup last, as sfsFromFasta_v2.py expects
+	f = open(path,'wb',outputBuffer)
+	writeFasta(f,refName,splicedSequence(ref,refName,plan))
+	for sample in file.keys():
+		writeFasta(f,sample,splicedSequence(file,sample,plan))
+	writeFasta(f,outName,splicedSequence(out,outName,plan))
+	f.close()
+
+	return(len(file.keys()) + 2)
+def subsetGene(task):
+
+	# One gene of a multi-region table, run in the pool or in the main process
+	gene,exons,output = task
+	plan = extractionPlan(exons)
+	written = writeSubset(os.path.join(output,str(gene) + '.fa'),plan)
+
+	return([[str(gene)] + row for row in positionRows(plan)],written,plan[1].shape[0])
 #################BGD GROUP######################
 ########UNIVERSITAT AUTONOMA DE BARCELONA#######
 
@@ -25,104 +118,75 @@ if __name__ == '__main__':
 	parser.add_argument('--multiFasta', type = str, required = True, help = 'Raw data to estimate polymorphism.')
 	parser.add_argument('--outgroup', type = str, required = True, help = 'Outgroup sequence.')
 	parser.add_argument('--coordinates', type = str, required = True, help = 'Coordinates file containing following tabulated columns: start, end, strand, transcript')
-	parser.add_argument('--output', type = str, required = True, help = 'Output file without extension.')
+	parser.add_argument('--output', type = str, required = True, help = 'Output file without extension. Output directory with --multiRegion')
+	parser.add_argument('--multiRegion', action = 'store_true', help = 'Coordinates file has an extra gene column. Write one subset multi-FASTA per gene and a combined Positions.txt in the output directory')
+	parser.add_argument('--workers', type = int, required = False, default = 1, help = 'Number of processes used by --multiRegion')
+	parser.add_argument('--reader', type = str, required = False, default = 'pyfaidx', choices = readers, help = 'FASTA backend: pyfaidx, or mmap to read memory-mapped bytes through a built-in offsets index (fixed line width per record)')
+	parser.add_argument('--profile', type = str, required = False, help = 'Write wall time, CPU time, peak memory and item counts per stage to this JSON file')
 
 	args = parser.parse_args()
 	start = time.time()
 	
 
-	# START-END COLUMN AND SUMMARIZE BY TRANSCRIPT ALL COLUMNS TO ONE.
-	df = pd.read_csv(args.coordinates,sep='\t')
-	df['coordinates'] = df['start'].astype(str) + ',' + df['end'].astype(str)
-	df['length'] = df.apply(lambda row: row['end']-row['start']+1 ,axis=1)
-	
-	dfL = df.groupby(['strand','transcript'],sort=False)['length'].sum().reset_index().sort_values('strand').reset_index(drop=True)
-	dfC = df.groupby('strand')['coordinates'].apply(lambda x: ','.join(x))
-	dfC = dfC.apply(lambda x: [list(map(int,x.split(',')[i:i+2])) for i in range(0, len(x.split(',')), 2)]).reset_index()
-
-	# Open multi-Fasta
-	ref = px.Fasta(args.reference, sequence_always_upper=True)
-	file = px.Fasta(args.multiFasta, sequence_always_upper=True)
-	out = px.Fasta(args.outgroup, sequence_always_upper=True)
-
-	samples = list(file.keys())
-
-	f = open(args.output + '.fa','w')
-
-	# MultiFasta. Iter fasta to add sequence to matrix
-	for i in range(0,len(samples),1):
-		# Extract each sample sequence
-		if(dfC.shape[0] == 2):
-			if(i == 0):
-				# Ref
-				tmp = ref.get_spliced_seq(list(ref.keys())[0], dfC[dfC['strand']=='+']['coordinates'][0]).seq
-				tmp = tmp + reverseComplement(ref.get_spliced_seq(list(ref.keys())[0], dfC[dfC['strand']=='-']['coordinates'][1]).seq)
-				f.write('>' + list(ref.keys())[0] + '\n' + tmp +'\n')
-				# multiFasta
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				tmp = tmp + reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'][1]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-			elif(i==len(samples)-1):
-				# multiFasta
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				tmp = tmp + reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'][1]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-				# Outgroup
-				tmpOut = out.get_spliced_seq(list(out.keys())[0], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				tmpOut = tmp + reverseComplement(out.get_spliced_seq(list(out.keys())[0], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				print(tmpOut)
-				f.write('>' + list(out.keys())[0] + '\n' + tmpOut +'\n')
-			else:
-				# multiFasta
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				tmp = tmp + reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-		elif(dfC.shape[0] == 1 and dfC['strand'][0] == '+'):
-			if(i == 0):
-				# Ref
-				tmp = ref.get_spliced_seq(list(ref.keys())[0], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-			elif(i==len(samples) -1 ):
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-				# Outgroup
-				tmpOut = out.get_spliced_seq(list(out.keys())[0], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				f.write('>' + list(out.keys())[0] + '\n' + tmpOut +'\n')
+	profile = StageProfile(enabled=args.profile is not None,start=start)
+
+	# Exon coordinates of every transcript, computed once for all samples
+	with profile.stage('plan'):
+		df = pd.read_csv(args.coordinates,sep='\t')
+
+	if(args.multiRegion):
+		# One subset alignment per gene, every FASTA index opened once per process
+		if(not os.path.isdir(args.output)):
+			os.makedirs(args.output)
+		with profile.stage('index'):
+			tasks = [(gene,exons,args.output) for gene,exons in df.groupby('gene',sort=False)]
+			if(args.workers > 1):
+				pool = multiprocessing.Pool(args.workers,openIndexes,(args.reference,args.multiFasta,args.outgroup,args.reader))
+				results = pool.imap(subsetGene,tasks)
 			else:
-				tmp = file.get_spliced_seq(samples[i], dfC[dfC['strand']=='+']['coordinates'].iloc[0]).seq
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-		elif(dfC.shape[0] and dfC['strand'][0] == '-'):
-			if(i == 0):
-				# Ref
-				tmp = reverseComplement(ref.get_spliced_seq(list(ref.keys())[0], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-				tmp = reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-			elif(i == len(samples) -1 ):
-				tmp = reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-				# tmpOut
-				tmpOut = reverseComplement(out.get_spliced_seq(list(out.keys())[0], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + list(out.keys())[0] + '\n' + tmpOut +'\n')
-			else:
-				tmp = reverseComplement(file.get_spliced_seq(samples[i], dfC[dfC['strand']=='-']['coordinates'].iloc[0]).seq)
-				f.write('>' + samples[i] + '\n' + tmp +'\n')
-
-	# Extract positions 
-	start = 0
-	dfL['seqPos'] = 0
-	dfL['startCds'] = 0
-	for index,row in dfL.iterrows():
-		# print(row['length'])
-		# print(str(start)+',' +str(start+row['length']-1))
-		dfL.loc[index,['seqPos']] = str(start)+'..' +str(start+row['length']-1)
-		dfL.loc[index,['startCds']] = str(start)
-		start = start + row['length']
-
-	dfL = dfL[['transcript','strand','startCds','seqPos','length']]
-	dfL.to_csv(args.output + 'Positions.txt',header=True,index=False,sep='\t')
+				pool = None
+				openIndexes(args.reference,args.multiFasta,args.outgroup,args.reader)
+				results = map(subsetGene,tasks)
+
+		# Combined positions of every gene, in the order of the coordinates table
+		with profile.stage('extract'):
+			f = open(os.path.join(args.output,'Positions.txt'),'w')
+			f.write('\t'.join(['gene','transcript','strand','startCds','seqPos','length']) + '\n')
+			for rows,written,sites in results:
+				for row in rows:
+					f.write('\t'.join(row) + '\n')
+				profile.count('extract','genes',1)
+				profile.count('extract','transcripts',len(rows))
+				profile.count('extract','sites',sites)
+				profile.count('extract','records',written)
+			f.close()
+
+			if(pool is not None):
+				pool.close()
+				pool.join()
+	else:
+		with profile.stage('plan'):
+			plan = extractionPlan(df)
+		profile.count('plan','transcripts',len(plan[0]))
+		profile.count('plan','sites',plan[1].shape[0])
+
+		# Open multi-Fasta
+		with profile.stage('index'):
+			openIndexes(args.reference,args.multiFasta,args.outgroup,args.reader)
+		profile.count('index','samples',len(indexes[1].keys()))
+
+		with profile.stage('extract'):
+			profile.count('extract','records',writeSubset(args.output + '.fa',plan))
+
+		# Extract positions
+		with profile.stage('positions'):
+			f = open(args.output + 'Positions.txt','w')
+			f.write('\t'.join(['transcript','strand','startCds','seqPos','length']) + '\n')
+			for row in positionRows(plan):
+				f.write('\t'.join(row) + '\n')
+			f.close()
+
+	profile.write(args.profile,script='subsetMultiFasta.py',arguments=vars(args))
 
 
 